@@ -0,0 +1,217 @@
+"""Deterministic fixtures shaped like recorded Reddit and LinkedIn responses.
+
+Every fixture is generated from a fixed seed, so runs on different
+machines and versions parse byte-identical input. Files are written once
+under benchmarks/fixtures/ and reused.
+"""
+import json
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+REDDIT_SIZES = (100, 1000, 10000)
+THREAD_ID = "bench01"
+CREATED = 1700000000
+
+WORDS = (
+    "the a to of and is in that it for you this on with be are not have but as was what if "
+    "just they more like can about so would think people one all get or do there an at your "
+    "python reddit thread comment model data server async request parse memory latency"
+).split()
+
+def _sentence(rng, low, high):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + "."
+
+def _comment_tree(count, seed=7):
+    """Nested (comment, replies) tuples with a realistic fan-out: many top-level
+    comments, replies thinning out with depth."""
+    rng = random.Random(seed)
+    made = [0]
+
+    def build(depth, parent):
+        nodes = []
+        width = rng.randint(1, 4) if depth else count
+        for _ in range(width):
+            if made[0] >= count:
+                break
+            made[0] += 1
+            comment = {
+                "id": f"c{made[0]:06x}",
+                "parent": parent,
+                "author": f"user{rng.randint(1, max(2, count // 3))}" if made[0] % 11 else "op_author",
+                "body": " ".join(_sentence(rng, 4, 30) for _ in range(rng.randint(1, 4))),
+                "score": int(rng.paretovariate(1.2)) - rng.randint(0, 3),
+                "created": CREATED + made[0] * rng.randint(5, 40),
+                "controversial": rng.random() < 0.03,
+            }
+            replies = []
+            if depth < 9 and rng.random() < 0.55 / (depth + 1) ** 0.3:
+                replies = build(depth + 1, comment["id"])
+            nodes.append((comment, replies))
+        return nodes
+
+    return build(0, None)
+
+def reddit_thread_json(count):
+    def thing(comment, replies):
+        return {
+            "kind": "t1",
+            "data": {
+                "id": comment["id"],
+                "name": f"t1_{comment['id']}",
+                "parent_id": f"t1_{comment['parent']}" if comment["parent"] else f"t3_{THREAD_ID}",
+                "link_id": f"t3_{THREAD_ID}",
+                "author": comment["author"],
+                "body": comment["body"],
+                "body_html": f"&lt;div class=\"md\"&gt;&lt;p&gt;{comment['body']}&lt;/p&gt;&lt;/div&gt;",
+                "score": comment["score"],
+                "ups": comment["score"],
+                "downs": 0,
+                "created_utc": float(comment["created"]),
+                "is_submitter": comment["author"] == "op_author",
+                "controversiality": int(comment["controversial"]),
+                "stickied": False,
+                "distinguished": None,
+                "permalink": f"/r/bench/comments/{THREAD_ID}/benchmark_thread/{comment['id']}/",
+                "subreddit": "bench",
+                "replies": {
+                    "kind": "Listing",
+                    "data": {"after": None, "children": [thing(*reply) for reply in replies]},
+                } if replies else "",
+            },
+        }
+
+    post = {
+        "kind": "t3",
+        "data": {
+            "id": THREAD_ID,
+            "name": f"t3_{THREAD_ID}",
+            "title": "Benchmark thread",
+            "author": "op_author",
+            "created_utc": float(CREATED),
+            "score": 4321,
+            "upvote_ratio": 0.93,
+            "url": f"https://www.reddit.com/r/bench/comments/{THREAD_ID}/benchmark_thread/",
+            "selftext": "Fixture used by the offline benchmarks.",
+            "num_comments": count,
+            "permalink": f"/r/bench/comments/{THREAD_ID}/benchmark_thread/",
+            "subreddit": "bench",
+        },
+    }
+    return [
+        {"kind": "Listing", "data": {"children": [post], "after": None}},
+        {"kind": "Listing", "data": {"children": [thing(*node) for node in _comment_tree(count)], "after": None}},
+    ]
+
+def old_reddit_html(count):
+    def render(comment, replies):
+        cid = comment["id"]
+        author = comment["author"]
+        score = comment["score"]
+        classes = "thing id-t1_{0} noncollapsed comment{1}".format(
+            cid, " controversial" if comment["controversial"] else ""
+        )
+        children = "".join(render(*reply) for reply in replies)
+        return (
+            f'<div class=" {classes} " id="thing_t1_{cid}" data-fullname="t1_{cid}" data-type="comment" '
+            f'data-author="{author}" data-permalink="/r/bench/comments/{THREAD_ID}/benchmark_thread/{cid}/">'
+            f'<p class="parent"><a name="{cid}"></a></p><div class="midcol unvoted">'
+            '<div class="arrow up login-required access-required" role="button" tabindex="0"></div>'
+            '<div class="arrow down login-required access-required" role="button" tabindex="0"></div></div>'
+            '<div class="entry unvoted"><p class="tagline"><a href="javascript:void(0)" class="expand">[–]</a>'
+            f'<a href="https://old.reddit.com/user/{author}" class="author may-blank id-t2_x">{author}</a>'
+            f'<span class="userattrs"></span> <span class="score dislikes" title="{score - 1}">{score - 1} points</span>'
+            f'<span class="score unvoted" title="{score}">{score} points</span>'
+            f'<span class="score likes" title="{score + 1}">{score + 1} points</span> '
+            '<time title="Tue Nov 14 22:13:20 2023 UTC" datetime="2023-11-14T22:13:20+00:00" '
+            'class="live-timestamp">1 year ago</time></p>'
+            f'<form action="#" class="usertext warn-on-unload" id="form-t1_{cid}">'
+            f'<input type="hidden" name="thing_id" value="t1_{cid}"/>'
+            f'<div class="usertext-body may-blank-within md-container "><div class="md"><p>{comment["body"]}</p></div></div></form>'
+            '<ul class="flat-list buttons"><li class="first">'
+            f'<a href="https://old.reddit.com/r/bench/comments/{THREAD_ID}/benchmark_thread/{cid}/" '
+            'data-event-action="permalink" class="bylink" rel="nofollow">permalink</a></li>'
+            '<li><a href="javascript:void(0)" class="embed-comment">embed</a></li></ul></div>'
+            f'<div class="child"><div id="siteTable_t1_{cid}" class="sitetable listing">{children}</div></div>'
+            '<div class="clearleft"></div></div><div class="clearleft"></div>'
+        )
+
+    body = "".join(render(*node) for node in _comment_tree(count))
+    return (
+        '<!doctype html><html><head><title>Benchmark thread : bench</title></head><body>'
+        '<div class="content" role="main"><div class="commentarea">'
+        f'<div id="siteTable_t3_{THREAD_ID}" class="sitetable nestedlisting">{body}</div>'
+        '</div></div></body></html>'
+    )
+
+def linkedin_profile_html():
+    return (
+        '<!doctype html><html><head><title>Jane Bench | LinkedIn</title></head><body><main>'
+        '<section class="artdeco-card"><div class="ph5"><div class="mt2 relative">'
+        '<h1 class="text-heading-xlarge inline t-24 v-align-middle break-words">Jane Bench</h1>'
+        '<div class="text-body-medium break-words">Staff Engineer | Distributed systems, performance</div>'
+        '<span class="text-body-small inline t-black--light break-words">Berlin, Germany</span>'
+        '</div></div></section>'
+        + "".join(
+            f'<section class="artdeco-card"><div class="pvs-list__item">Experience {index}</div></section>'
+            for index in range(40)
+        )
+        + '</main></body></html>'
+    )
+
+def linkedin_posts(count, seed=11):
+    rng = random.Random(seed)
+    media_types = (["text only"], ["image"], ["video"], ["document"], ["poll"], ["image", "video"])
+    posts = []
+    for index in range(count):
+        hashtags = rng.sample(["python", "performance", "hiring", "ai", "devops", "career", "rust"], rng.randint(0, 3))
+        text = " ".join(_sentence(rng, 8, 40) for _ in range(rng.randint(1, 6)))
+        text += "".join(f" #{tag}" for tag in hashtags)
+        posts.append({
+            "id": index + 1,
+            "text": text,
+            "timestamp": f"{rng.randint(1, 30)}d",
+            "reactions": str(rng.randint(0, 5000)),
+            "comments": f"{rng.randint(0, 300)} comments",
+            "hashtags": hashtags,
+            "media_type": rng.choice(media_types),
+        })
+    return posts
+
+def linkedin_activity_html(count=10):
+    parts = []
+    for post in linkedin_posts(count):
+        media = "".join(f'<div class="feed-shared-{kind}"></div>' for kind in post["media_type"] if kind != "text only")
+        parts.append(
+            '<div class="feed-shared-update-v2 relative artdeco-card">'
+            f'<span class="feed-shared-actor__sub-description">{post["timestamp"]}</span>'
+            f'<div class="feed-shared-update-v2__description"><span dir="ltr">{post["text"]}</span></div>'
+            f'{media}<ul><li><span class="social-details-social-counts__reactions-count">{post["reactions"]}</span></li>'
+            f'<li class="social-details-social-counts__comments">{post["comments"]}</li></ul></div>'
+        )
+    return f'<!doctype html><html><body><main>{"".join(parts)}</main></body></html>'
+
+def _write(path, content):
+    with open(path, "w", encoding="utf-8") as fixture_file:
+        fixture_file.write(content)
+
+def ensure_fixtures(sizes=REDDIT_SIZES):
+    """Write the fixture files that are missing and return their paths."""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    paths = {}
+    for size in sizes:
+        for kind, extension, build in (
+            ("json", "json", lambda size: json.dumps(reddit_thread_json(size))),
+            ("html", "html", old_reddit_html),
+        ):
+            path = os.path.join(FIXTURE_DIR, f"reddit_{size}.{extension}")
+            if not os.path.exists(path):
+                _write(path, build(size))
+            paths[("reddit", kind, size)] = path
+
+    for name, build in (("profile", linkedin_profile_html), ("activity", linkedin_activity_html)):
+        path = os.path.join(FIXTURE_DIR, f"linkedin_{name}.html")
+        if not os.path.exists(path):
+            _write(path, build())
+        paths[("linkedin", name)] = path
+    return paths
@@ -0,0 +1,246 @@
+"""Load test of the SSE transport with many concurrent MCP sessions.
+
+For every concurrency level N, N client sessions are opened against the
+SSE servers and call a mix of reddit_extract and linkedin_analyze for
+`--duration` seconds. Upstream requests are answered by the local stand-in
+from upstream.py, with configurable latency and error rate, so runs are
+repeatable and never touch the real sites.
+
+Servers whose --reddit-sse / --linkedin-sse URL is not given are started
+as subprocesses pointed at the stand-in with --upstream-base-url. Servers
+started by hand must be given the same option. With --combined, a single
+combined-mcp process serves both tools instead. --transport streamable-http
+(with --workers server processes) needs mcp>=1.8.
+
+    python benchmarks/loadtest.py --concurrency 1,8,32 --duration 15 --latency 0.1 --error-rate 0.01
+"""
+import contextlib
+import datetime
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import anyio
+import click
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from upstream import UpstreamStandIn
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+RESULT_SCHEMA_VERSION = 1
+REDDIT_THREAD_URL = "https://www.reddit.com/r/bench/comments/bench01/benchmark_thread/"
+LINKEDIN_PROFILE_URL = "https://www.linkedin.com/in/jane-bench"
+PERCENTILES = (50, 95, 99)
+SERVER_START_TIMEOUT = 30.0
+
+TOOL_CALLS = {
+    "reddit_extract": {"url": REDDIT_THREAD_URL, "output": "json"},
+    "linkedin_analyze": {"url": LINKEDIN_PROFILE_URL, "output": "json"},
+}
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def _wait_for_port(port, process, timeout=SERVER_START_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise Exception(f"Server exited during startup with code {process.returncode}")
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=0.5):
+            return
+        time.sleep(0.1)
+    raise Exception(f"Server did not listen on port {port} within {timeout:.0f}s")
+
+@contextlib.contextmanager
+def spawned_server(module, upstream_url, extra_args=(), transport="sse"):
+    port = _free_port()
+    package_dir = os.path.join(ROOT, module.split("_")[0] + "-mcp")
+    # combined_mcp imports the other two packages, and every server imports mcp_common
+    package_dirs = [os.path.join(ROOT, name) for name in ("mcp-common", "reddit-mcp", "linkedin-mcp", "combined-mcp")]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [*package_dirs, os.environ.get("PYTHONPATH")]))}
+    process = subprocess.Popen(
+        [sys.executable, "-m", f"{module}.server", "--transport", transport, "--port", str(port),
+         "--upstream-base-url", upstream_url, *extra_args],
+        cwd=package_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_for_port(port, process)
+        yield f"http://127.0.0.1:{port}/{'mcp/' if transport == 'streamable-http' else 'sse'}"
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def _call_failed(result):
+    if result.isError:
+        return True
+    try:
+        payload = json.loads(result.content[0].text)
+    except (IndexError, AttributeError, ValueError):
+        return True
+    # linkedin_analyze reports fetch errors inside the profile and posts parts
+    return "error" in payload or any(
+        isinstance(payload.get(part), dict) and "error" in payload[part] for part in ("profile", "posts")
+    )
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for _, latency, failed in samples if not failed)
+    errors = sum(1 for _, _, failed in samples if failed)
+    return {
+        "calls": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_per_s": round(len(latencies) / elapsed, 2),
+        **{f"p{percent}_s": percentile(latencies, percent) for percent in PERCENTILES},
+    }
+
+def _client(url, transport):
+    if transport == "streamable-http":
+        from mcp.client.streamable_http import streamablehttp_client
+
+        return streamablehttp_client(url, timeout=datetime.timedelta(seconds=30))
+    return sse_client(url, timeout=30)
+
+async def run_session(server_urls, transport, tools, weights, deadline, samples, session_errors, rng):
+    try:
+        async with contextlib.AsyncExitStack() as stack:
+            sessions = {}
+            for tool in tools:
+                url = server_urls[tool]
+                if url not in sessions:
+                    streams = await stack.enter_async_context(_client(url, transport))
+                    sessions[url] = await stack.enter_async_context(ClientSession(*streams[:2]))
+                    await sessions[url].initialize()
+
+            while time.monotonic() < deadline:
+                tool = rng.choices(tools, weights)[0]
+                started = time.monotonic()
+                try:
+                    result = await sessions[server_urls[tool]].call_tool(tool, TOOL_CALLS[tool])
+                    failed = _call_failed(result)
+                except Exception:
+                    failed = True
+                samples.append((tool, time.monotonic() - started, failed))
+    except Exception as e:
+        session_errors.append(str(e))
+
+async def run_level(server_urls, transport, tools, weights, concurrency, duration, seed):
+    samples = []
+    session_errors = []
+    started = time.monotonic()
+    deadline = started + duration
+    async with anyio.create_task_group() as task_group:
+        for index in range(concurrency):
+            task_group.start_soon(
+                run_session, server_urls, transport, tools, weights, deadline, samples, session_errors,
+                random.Random(seed + index),
+            )
+    elapsed = time.monotonic() - started
+
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "session_errors": len(session_errors),
+        **summarize(samples, elapsed),
+        "tools": {
+            tool: summarize([sample for sample in samples if sample[0] == tool], elapsed) for tool in tools
+        },
+    }
+
+def _milliseconds(seconds):
+    return f"{seconds * 1000:8.1f}" if seconds is not None else f"{'-':>8}"
+
+def print_level(level):
+    rows = [("all", level)] + list(level["tools"].items())
+    for name, row in rows:
+        print(
+            f"{level['concurrency']:>5} {name:18} {row['calls']:>7} {row['throughput_per_s']:>9.1f}/s "
+            + " ".join(_milliseconds(row[f"p{percent}_s"]) for percent in PERCENTILES)
+            + f" {row['error_rate'] * 100:>6.2f}%"
+        )
+
+@click.command()
+@click.option("--concurrency", default="1,4,16", help="Comma separated numbers of concurrent sessions")
+@click.option("--duration", default=10.0, help="Seconds each concurrency level runs")
+@click.option("--reddit-share", default=0.7, help="Fraction of calls going to reddit_extract, the rest to linkedin_analyze")
+@click.option("--reddit-sse", default=None, help="SSE (or /mcp/) URL of a running reddit-mcp (default: start one)")
+@click.option("--linkedin-sse", default=None, help="SSE (or /mcp/) URL of a running linkedin-mcp (default: start one)")
+@click.option("--combined", is_flag=True, help="Start one combined-mcp serving both tools instead of two servers")
+@click.option("--transport", type=click.Choice(["sse", "streamable-http"]), default="sse", help="MCP transport of the servers")
+@click.option("--workers", default=1, help="Server processes of the started servers (streamable-http only)")
+@click.option("--upstream-url", default=None, help="Base URL of a running upstream.py (default: start one)")
+@click.option("--latency", default=0.05, help="Mean upstream latency in seconds of the started stand-in")
+@click.option("--error-rate", default=0.0, help="Fraction of failed upstream requests of the started stand-in")
+@click.option("--thread-size", default=1000, help="Comments in the Reddit thread served by the started stand-in")
+@click.option("--seed", default=1, help="Seed of the tool mix")
+@click.option("--output", default=None, help="Result file (default: benchmarks/results/loadtest-<time>.json)")
+def main(concurrency, duration, reddit_share, reddit_sse, linkedin_sse, combined, transport, workers, upstream_url,
+         latency, error_rate, thread_size, seed, output):
+    levels = [int(level) for level in concurrency.split(",") if level]
+    weights = {"reddit_extract": reddit_share, "linkedin_analyze": 1 - reddit_share}
+    tools = [tool for tool, weight in weights.items() if weight > 0]
+    server_args = ["--workers", str(workers)] if workers > 1 else []
+
+    with contextlib.ExitStack() as stack:
+        if upstream_url is None:
+            stand_in = UpstreamStandIn(latency=latency, error_rate=error_rate, thread_size=thread_size, seed=seed)
+            stand_in.start()
+            stack.callback(stand_in.stop)
+            upstream_url = stand_in.base_url
+        if combined and reddit_sse is None and linkedin_sse is None:
+            reddit_sse = linkedin_sse = stack.enter_context(
+                spawned_server("combined_mcp", upstream_url, ["--rate-limit", "100000", *server_args], transport)
+            )
+        if reddit_sse is None and "reddit_extract" in tools:
+            # The stand-in is local, reddit's request pacing would only measure the limiter
+            reddit_sse = stack.enter_context(
+                spawned_server("reddit_mcp", upstream_url, ["--rate-limit", "100000", *server_args], transport)
+            )
+        if linkedin_sse is None and "linkedin_analyze" in tools:
+            linkedin_sse = stack.enter_context(spawned_server("linkedin_mcp", upstream_url, server_args, transport))
+        server_urls = {"reddit_extract": reddit_sse, "linkedin_analyze": linkedin_sse}
+
+        print(f"{'conc':>5} {'tool':18} {'calls':>7} {'throughput':>11} "
+              + " ".join(f"{'p' + str(percent) + ' ms':>8}" for percent in PERCENTILES) + f" {'errors':>7}")
+        results = []
+        for level in levels:
+            result = anyio.run(
+                run_level, server_urls, transport, tools, [weights[tool] for tool in tools], level, duration, seed
+            )
+            print_level(result)
+            results.append(result)
+
+    report = {
+        "schema_version": RESULT_SCHEMA_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "upstream": {"url": upstream_url, "latency_s": latency, "error_rate": error_rate, "thread_size": thread_size},
+        "mix": weights,
+        "combined": reddit_sse == linkedin_sse,
+        "transport": transport,
+        "workers": workers,
+        "levels": results,
+    }
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"loadtest-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w") as result_file:
+        json.dump(report, result_file, indent=2)
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
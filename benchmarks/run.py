@@ -0,0 +1,282 @@
+"""Offline benchmarks for the Reddit and LinkedIn parsers, analyzers and formatters.
+
+Usage:
+    python benchmarks/run.py [--sizes 100,1000,10000] [--repeat 5] [--filter reddit.]
+                             [--output results.json] [--compare previous.json]
+
+Each benchmark is timed with timeit (best and median of `--repeat` rounds,
+the number of calls per round is picked automatically) and its peak
+allocation is measured with tracemalloc on a separate call. Results are
+written as JSON next to the git revision and library versions, so two
+result files can be compared with --compare.
+"""
+import asyncio
+import datetime
+import http.server
+import importlib.metadata
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import timeit
+import tracemalloc
+
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, name) for name in ("mcp-common", "reddit-mcp", "linkedin-mcp")]
+
+import httpx  # noqa: E402
+from fixtures import REDDIT_SIZES, ensure_fixtures, linkedin_posts  # noqa: E402
+from linkedin_mcp.server import LinkedInAnalyzer, format_linkedin_analysis  # noqa: E402
+from reddit_mcp.html_parser import HTML_PARSER_BACKENDS, _lxml_available  # noqa: E402
+from reddit_mcp.server import RedditExtractor, format_reddit_data, render_reddit_page  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+RESULT_SCHEMA_VERSION = 1
+LINKEDIN_PROFILE_PATH = "/in/jane-bench"
+LINKEDIN_POST_COUNTS = (10, 1000)
+
+class Benchmark:
+    def __init__(self, name, func, size=None, unit=None, is_async=False):
+        self.name = name
+        self.func = func
+        self.size = size
+        self.unit = unit
+        self.is_async = is_async
+
+def _read(path, mode="r"):
+    with open(path, mode) as fixture_file:
+        return fixture_file.read()
+
+def _quiet(func):
+    # The extractors report progress with print(), keep it out of the timings
+    def call():
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        try:
+            return func()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    return call
+
+def _serve_linkedin(paths):
+    pages = {
+        LINKEDIN_PROFILE_PATH: _read(paths[("linkedin", "profile")], "rb"),
+        LINKEDIN_PROFILE_PATH + "/recent-activity/shares/": _read(paths[("linkedin", "activity")], "rb"),
+    }
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = pages.get(self.path)
+            self.send_response(200 if body is not None else 404)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body or b"")))
+            self.end_headers()
+            self.wfile.write(body or b"")
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def reddit_benchmarks(paths, sizes):
+    benchmarks = []
+    backends = [backend for backend in HTML_PARSER_BACKENDS if backend != "lxml" or _lxml_available()]
+
+    for size in sizes:
+        response_data = json.loads(_read(paths[("reddit", "json", size)]))
+        page_html = _read(paths[("reddit", "html", size)], "rb")
+        extractor = RedditExtractor(client=None)
+
+        benchmarks.append(Benchmark(
+            "reddit.extract_comments_from_api",
+            lambda extractor=extractor, response_data=response_data: extractor._extract_comments_from_api(response_data),
+            size, "comments",
+        ))
+
+        for backend in backends:
+            client = httpx.AsyncClient(
+                transport=httpx.MockTransport(
+                    lambda request, page_html=page_html: httpx.Response(
+                        200, content=page_html, headers={"Content-Type": "text/html; charset=utf-8"}
+                    )
+                )
+            )
+            html_extractor = RedditExtractor(client, html_parser=backend)
+            benchmarks.append(Benchmark(
+                f"reddit.extract_comments_from_html[{backend}]",
+                lambda html_extractor=html_extractor: html_extractor._extract_comments_from_html(
+                    "https://old.reddit.com/r/bench/comments/bench01/benchmark_thread/"
+                ),
+                size, "comments", is_async=True,
+            ))
+
+        comments = extractor._extract_comments_from_api(response_data)
+        data = {
+            "discussion": extractor._discussion_metadata_from_data(response_data[0]["data"]["children"][0]["data"]),
+            "comments": comments,
+            "stats": {"total_comments": len(comments), "extraction_method": "api"},
+        }
+        benchmarks.append(Benchmark(
+            "reddit.format_reddit_data", lambda data=data: format_reddit_data(data), size, "comments"
+        ))
+        benchmarks.append(Benchmark(
+            "reddit.format_reddit_data[unbounded]",
+            lambda data=data: render_reddit_page(data, 0, sys.maxsize),
+            size, "comments",
+        ))
+    return benchmarks
+
+def linkedin_benchmarks(base_url):
+    analyzer = LinkedInAnalyzer()
+    profile_url = base_url + LINKEDIN_PROFILE_PATH
+    benchmarks = [
+        Benchmark("linkedin.extract_profile_data", lambda: analyzer.extract_profile_data(profile_url), 1, "profiles"),
+        Benchmark("linkedin.extract_recent_posts", lambda: analyzer.extract_recent_posts(profile_url), 10, "posts"),
+    ]
+
+    for count in LINKEDIN_POST_COUNTS:
+        posts = linkedin_posts(count)
+        benchmarks.append(Benchmark(
+            "linkedin.analyze_content_patterns",
+            lambda posts=posts: analyzer.analyze_content_patterns(posts),
+            count, "posts",
+        ))
+
+    analysis_data = {
+        "profile": analyzer.extract_profile_data(profile_url),
+        "posts": analyzer.extract_recent_posts(profile_url),
+    }
+    analysis_data["analysis"] = analyzer.analyze_content_patterns(analysis_data["posts"])
+    benchmarks.append(Benchmark(
+        "linkedin.format_linkedin_analysis", lambda: format_linkedin_analysis(analysis_data), 1, "reports"
+    ))
+    return benchmarks
+
+def run_benchmark(benchmark, repeat, loop):
+    func = benchmark.func
+    if benchmark.is_async:
+        func = lambda coroutine_function=benchmark.func: loop.run_until_complete(coroutine_function())  # noqa: E731
+    func = _quiet(func)
+
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [total / number for total in timer.repeat(repeat, number)]
+
+    tracemalloc.start()
+    func()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        "name": benchmark.name,
+        "size": benchmark.size,
+        "unit": benchmark.unit,
+        "calls_per_round": number,
+        "rounds": repeat,
+        "best_s": min(timings),
+        "median_s": median,
+        "throughput_per_s": benchmark.size / median if benchmark.size else None,
+        "peak_memory_bytes": peak_memory,
+    }
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _package_versions():
+    versions = {}
+    for package in ("httpx", "beautifulsoup4", "lxml", "ijson", "orjson", "numpy", "requests"):
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+def _result_key(result):
+    return result["name"], result["size"]
+
+def print_results(results, baseline=None):
+    previous = {_result_key(result): result for result in (baseline or {}).get("benchmarks", [])}
+    header = f"{'benchmark':48} {'size':>6} {'median':>11} {'throughput':>14} {'peak mem':>10}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+
+    for result in results:
+        line = (
+            f"{result['name']:48} {result['size'] or '':>6} {result['median_s'] * 1000:>9.3f}ms "
+            f"{result['throughput_per_s'] or 0:>10.0f}/s {result['peak_memory_bytes'] / 1024:>8.0f}KB"
+        )
+        base_result = previous.get(_result_key(result))
+        if base_result:
+            line += f" {result['median_s'] / base_result['median_s']:>7.2f}x"
+        print(line)
+
+@click.command()
+@click.option("--sizes", default=",".join(map(str, REDDIT_SIZES)), help="Comma separated Reddit thread sizes")
+@click.option("--repeat", default=5, help="Timing rounds per benchmark")
+@click.option("--filter", "name_filter", default="", help="Only run benchmarks whose name contains this")
+@click.option("--output", default=None, help="Result file (default: benchmarks/results/<time>-<revision>.json)")
+@click.option("--compare", default=None, help="Earlier result file to compare medians against")
+def main(sizes, repeat, name_filter, output, compare):
+    sizes = tuple(int(size) for size in sizes.split(",") if size)
+    paths = ensure_fixtures(sizes)
+    server = _serve_linkedin(paths)
+    loop = asyncio.new_event_loop()
+
+    try:
+        benchmarks = reddit_benchmarks(paths, sizes) + linkedin_benchmarks(
+            f"http://127.0.0.1:{server.server_address[1]}"
+        )
+        results = []
+        for benchmark in benchmarks:
+            if name_filter not in benchmark.name:
+                continue
+            results.append(run_benchmark(benchmark, repeat, loop))
+            print(f"  {benchmark.name} [{benchmark.size}] done", file=sys.stderr)
+    finally:
+        server.shutdown()
+        loop.close()
+
+    revision = _git_revision()
+    report = {
+        "schema_version": RESULT_SCHEMA_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "packages": _package_versions(),
+        "benchmarks": results,
+    }
+
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{revision or 'unknown'}.json")
+    with open(output, "w") as result_file:
+        json.dump(report, result_file, indent=2)
+
+    baseline = None
+    if compare:
+        with open(compare) as baseline_file:
+            baseline = json.load(baseline_file)
+    print_results(results, baseline)
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
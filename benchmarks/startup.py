@@ -0,0 +1,118 @@
+"""Cold-start benchmark: time from launching a stdio server to its first list_tools answer.
+
+Each round starts a fresh interpreter running the server over stdio, the
+way MCP hosts launch it, and records the time until `initialize` and then
+`list_tools` are answered. Optionally, `-X importtime` output of one extra
+launch is summarized to show which imports still dominate.
+
+    python benchmarks/startup.py [--rounds 10] [--server reddit] [--importtime]
+"""
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import anyio
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from mcp import ClientSession, StdioServerParameters  # noqa: E402
+from mcp.client.stdio import stdio_client  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+RESULT_SCHEMA_VERSION = 1
+SERVERS = {
+    "reddit": ("reddit_mcp", os.path.join(ROOT, "reddit-mcp")),
+    "linkedin": ("linkedin_mcp", os.path.join(ROOT, "linkedin-mcp")),
+    "combined": ("combined_mcp", os.path.join(ROOT, "combined-mcp")),
+}
+# The combined server imports both packages, and every server imports mcp_common
+PYTHONPATH = os.pathsep.join([os.path.join(ROOT, "mcp-common"), *(package_dir for _, package_dir in SERVERS.values())])
+TOP_IMPORTS = 15
+
+def _server_parameters(server, python_args=()):
+    module, package_dir = SERVERS[server]
+    return StdioServerParameters(
+        command=sys.executable,
+        args=[*python_args, "-m", f"{module}.server"],
+        cwd=package_dir,
+        env={**os.environ, "PYTHONPATH": PYTHONPATH},
+    )
+
+async def time_launch(server):
+    started = time.perf_counter()
+    async with stdio_client(_server_parameters(server)) as streams:
+        async with ClientSession(*streams) as session:
+            await session.initialize()
+            initialized = time.perf_counter()
+            await session.list_tools()
+            listed = time.perf_counter()
+    return initialized - started, listed - started
+
+def import_profile(server):
+    """Slowest modules (cumulative microseconds) imported directly by the server module."""
+    module, package_dir = SERVERS[server]
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}.server"],
+        cwd=package_dir, env={**os.environ, "PYTHONPATH": PYTHONPATH}, capture_output=True, text=True,
+    )
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Each nesting level indents the name by two more spaces, keep the server and what it imports directly
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            entries.append((int(cumulative), name.strip()))
+    return sorted(entries, reverse=True)[:TOP_IMPORTS]
+
+@click.command()
+@click.option("--server", "servers", type=click.Choice(sorted(SERVERS)), multiple=True, help="Server(s) to launch (default: all)")
+@click.option("--rounds", default=10, help="Launches per server")
+@click.option("--importtime", is_flag=True, help="Also list the slowest direct imports of each server")
+@click.option("--output", default=None, help="Result file (default: benchmarks/results/startup-<time>.json)")
+def main(servers, rounds, importtime, output):
+    results = []
+    for server in servers or sorted(SERVERS):
+        timings = [anyio.run(time_launch, server) for _ in range(rounds)]
+        initialize = [initialized for initialized, _ in timings]
+        list_tools = [listed for _, listed in timings]
+        result = {
+            "server": server,
+            "rounds": rounds,
+            "initialize_median_s": statistics.median(initialize),
+            "list_tools_min_s": min(list_tools),
+            "list_tools_median_s": statistics.median(list_tools),
+        }
+        print(
+            f"{server:10} initialize {result['initialize_median_s'] * 1000:7.1f}ms  "
+            f"list_tools {result['list_tools_median_s'] * 1000:7.1f}ms (best {result['list_tools_min_s'] * 1000:.1f}ms)"
+        )
+        if importtime:
+            result["slowest_imports"] = [
+                {"module": name, "cumulative_us": cumulative} for cumulative, name in import_profile(server)
+            ]
+            for entry in result["slowest_imports"]:
+                print(f"    {entry['cumulative_us'] / 1000:7.1f}ms  {entry['module']}")
+        results.append(result)
+
+    report = {
+        "schema_version": RESULT_SCHEMA_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "servers": results,
+    }
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"startup-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w") as result_file:
+        json.dump(report, result_file, indent=2)
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Local stand-in for reddit.com and linkedin.com used by the load tests.
+
+Serves the benchmark fixtures for every thread and profile URL, after an
+artificial latency, and fails a configurable fraction of requests. Point
+the servers at it with --upstream-base-url:
+
+    python benchmarks/upstream.py --port 9000 --latency 0.1 --error-rate 0.02
+    reddit-mcp --transport sse --port 8000 --upstream-base-url http://127.0.0.1:9000 --rate-limit 1000
+    linkedin-mcp --transport sse --port 8001 --upstream-base-url http://127.0.0.1:9000
+"""
+import http.server
+import json
+import random
+import re
+import threading
+import time
+
+import click
+from fixtures import (
+    linkedin_activity_html,
+    linkedin_profile_html,
+    old_reddit_html,
+    reddit_thread_json,
+)
+
+
+class UpstreamStandIn:
+    """Threaded HTTP server answering with fixture pages.
+
+    Each response is delayed by `latency` seconds +/- `jitter` (a fraction
+    of it) and `error_rate` of the requests get `error_status` instead.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.05, jitter=0.5, error_rate=0.0,
+                 error_status=503, thread_size=1000, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0}
+        self.pages = {
+            "reddit_json": json.dumps(reddit_thread_json(thread_size)).encode(),
+            "reddit_html": old_reddit_html(thread_size).encode(),
+            "morechildren": json.dumps({"json": {"errors": [], "data": {"things": []}}}).encode(),
+            "linkedin_profile": linkedin_profile_html().encode(),
+            "linkedin_activity": linkedin_activity_html().encode(),
+        }
+        self.server = http.server.ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def route(self, path):
+        path = path.split("?", 1)[0]
+        if path.startswith("/api/morechildren"):
+            return "morechildren", "application/json"
+        if re.match(r"^/r/\w+/comments/\w+", path):
+            if path.endswith(".json"):
+                return "reddit_json", "application/json"
+            return "reddit_html", "text/html; charset=utf-8"
+        if re.match(r"^/in/[^/]+/recent-activity/", path):
+            return "linkedin_activity", "text/html; charset=utf-8"
+        if re.match(r"^/in/[^/]+/?$", path):
+            return "linkedin_profile", "text/html; charset=utf-8"
+        return None, None
+
+    def _draw(self):
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency * (1 + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.stats["errors"] += 1
+        return max(0.0, delay), failed
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                delay, failed = stand_in._draw()
+                time.sleep(delay)
+
+                page, content_type = stand_in.route(self.path)
+                if failed:
+                    status, body, content_type = stand_in.error_status, b"stand-in error", "text/plain"
+                elif page is None:
+                    status, body, content_type = 404, b"not found", "text/plain"
+                else:
+                    status, body = 200, stand_in.pages[page]
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@click.command()
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", default=9000)
+@click.option("--latency", default=0.05, help="Mean seconds before each response")
+@click.option("--jitter", default=0.5, help="Latency varies uniformly by this fraction either way")
+@click.option("--error-rate", default=0.0, help="Fraction of requests answered with --error-status")
+@click.option("--error-status", default=503, help="Status code of failed requests")
+@click.option("--thread-size", default=1000, help="Comments in the served Reddit thread")
+def main(host, port, latency, jitter, error_rate, error_status, thread_size):
+    stand_in = UpstreamStandIn(host, port, latency, jitter, error_rate, error_status, thread_size)
+    print(f"Upstream stand-in listening on {stand_in.base_url}")
+    try:
+        stand_in.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import contextlib
+
+import anyio
+import click
+import mcp.types as types
+from mcp.server.lowlevel import Server
+
+from linkedin_mcp.server import LINKEDIN_TOOLS, linkedin_tools
+from mcp_common.cli import run_server, server_options
+from mcp_common.executor import ToolExecutor
+from mcp_common.http_app import create_http_app
+from mcp_common.http_cache import HTTPCache
+from mcp_common.metrics import (
+    REGISTRY,
+    register_cache_metrics,
+    register_executor_metrics,
+    track_tool_call,
+)
+from mcp_common.profiling import DEFAULT_PROFILE_DIR, CallProfiler
+from reddit_mcp.http_client import create_connection_pool, create_http_client
+from reddit_mcp.pagination import CursorLog
+from reddit_mcp.rate_limit import RateLimiter
+from reddit_mcp.server import REDDIT_TOOLS, reddit_options, register_reddit_tools
+
+ALL_TOOLS = REDDIT_TOOLS + LINKEDIN_TOOLS
+
+def parse_tools(ctx, param, value):
+    if not value:
+        return ALL_TOOLS
+    tools = tuple(tool.strip() for tool in value.split(",") if tool.strip())
+    unknown = [tool for tool in tools if tool not in ALL_TOOLS]
+    if unknown:
+        raise click.BadParameter(f"Unknown tools {', '.join(unknown)}, available: {', '.join(ALL_TOOLS)}")
+    return tools
+
+def create_server(
+    tools=ALL_TOOLS,
+    http2=False,
+    max_connections=20,
+    rate_limit=10.0,
+    max_retries=3,
+    max_workers=8,
+    tool_concurrency=4,
+    batch_concurrency=8,
+    html_parser=None,
+    stream_parse=False,
+    cache=False,
+    cache_path=None,
+    cache_ttl=60.0,
+    cache_max_mb=256,
+    watch_interval=30.0,
+    continuation_max_mb=128,
+    upstream_base_url=None,
+    profile_rate=0.0,
+    profile_dir=DEFAULT_PROFILE_DIR,
+    processes=1,
+):
+    """The combined Server and what it runs on, returned as (app, init_options, serving, stats).
+
+    Only the tool sets with a tool in `tools` are set up.
+    """
+    app = Server("mcp-ethical-hacking")
+    http_cache = None
+    if cache:
+        http_cache = HTTPCache(cache_path, ttl=cache_ttl, max_bytes=cache_max_mb * 1024 * 1024)
+    pool = create_connection_pool(http2=http2, max_connections=max_connections)
+    executor = ToolExecutor(max_workers=max_workers, tool_concurrency=tool_concurrency)
+    register_executor_metrics(executor)
+    profiler = CallProfiler(profile_rate, profile_dir)
+    if http_cache is not None:
+        register_cache_metrics(http_cache)
+
+    clients = []
+    rate_limiters = {}
+    tool_lists = []
+    handlers = {}
+    watcher = None
+
+    if any(tool in REDDIT_TOOLS for tool in tools):
+        rate_limiters['reddit'] = RateLimiter(rate=rate_limit, share=1 / processes)
+        reddit_client = create_http_client(
+            cache=http_cache,
+            rate_limiter=rate_limiters['reddit'],
+            max_retries=max_retries,
+            upstream_base_url=upstream_base_url,
+            pool=pool,
+        )
+        clients.append(reddit_client)
+        list_reddit_tools, reddit_tool, watcher = register_reddit_tools(
+            app,
+            reddit_client,
+            executor,
+            html_parser=html_parser,
+            stream_parse=stream_parse,
+            batch_concurrency=batch_concurrency,
+            watch_interval=watch_interval,
+            continuation_max_mb=continuation_max_mb,
+            # Cursors of one worker can come back to another
+            cursor_log=CursorLog() if processes > 1 else None,
+        )
+        tool_lists.append(list_reddit_tools)
+        handlers.update({tool: reddit_tool for tool in REDDIT_TOOLS if tool in tools})
+
+    if any(tool in LINKEDIN_TOOLS for tool in tools):
+        # A bucket of its own, so reddit's X-Ratelimit pauses never hold LinkedIn requests
+        rate_limiters['linkedin'] = RateLimiter(rate=rate_limit, share=1 / processes)
+        linkedin_client = create_http_client(
+            cache=http_cache,
+            rate_limiter=rate_limiters['linkedin'],
+            max_retries=max_retries,
+            upstream_base_url=upstream_base_url,
+            pool=pool,
+        )
+        clients.append(linkedin_client)
+        list_linkedin_tools, linkedin_tool = linkedin_tools(executor, client=linkedin_client)
+        tool_lists.append(list_linkedin_tools)
+        handlers.update({tool: linkedin_tool for tool in LINKEDIN_TOOLS if tool in tools})
+
+    @app.call_tool()
+    async def call_tool(
+        name: str, arguments: dict
+    ) -> list[types.TextContent]:
+        if name not in handlers:
+            raise ValueError(f"Unknown tool: {name}")
+        with track_tool_call(name), profiler.profile(name):
+            return await handlers[name](name, arguments)
+
+    @app.list_tools()
+    async def list_tools() -> list[types.Tool]:
+        listed = []
+        for list_group in tool_lists:
+            listed.extend(tool for tool in await list_group() if tool.name in handlers)
+        return listed
+
+    init_options = app.create_initialization_options()
+    if watcher is not None:
+        # The low-level server never advertises resource subscriptions on its own
+        init_options.capabilities.resources.subscribe = True
+
+    @contextlib.asynccontextmanager
+    async def serving():
+        async with contextlib.AsyncExitStack() as stack:
+            for client in clients:
+                await stack.enter_async_context(client)
+            task_group = await stack.enter_async_context(anyio.create_task_group())
+            if watcher is not None:
+                task_group.start_soon(watcher.run)
+            yield
+            task_group.cancel_scope.cancel()
+
+    def stats():
+        return {
+            **executor.stats(),
+            'rate_limit': {host: limiter.stats() for host, limiter in rate_limiters.items()},
+        }
+
+    return app, init_options, serving, stats
+
+def create_app(transport="sse", debug=False, **options):
+    app, init_options, serving, stats = create_server(**options)
+    return create_http_app(app, init_options, serving, stats, REGISTRY.render, transport, debug)
+
+@click.command()
+@server_options
+@click.option(
+    "--tools",
+    envvar="MCP_TOOLS",
+    default=None,
+    callback=parse_tools,
+    help=f"Comma separated tools to serve (default: all of {', '.join(ALL_TOOLS)})",
+)
+@reddit_options
+@click.option(
+    "--upstream-base-url",
+    envvar="MCP_UPSTREAM_BASE_URL",
+    default=None,
+    help="Send upstream requests to this server instead of reddit.com and linkedin.com (e.g. a local stand-in for load tests)",
+)
+def main(port: int, transport: str, workers: int, debug: bool, tools: tuple[str, ...], **options) -> int:
+    run_server(__name__, create_server, port, transport, workers, debug, tools=list(tools), processes=workers, **options)
+    return 0
+
+if __name__ == "__main__":
+    main()
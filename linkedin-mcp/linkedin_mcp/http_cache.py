@@ -0,0 +1,86 @@
+import io
+from urllib.parse import urlsplit, urlunsplit
+
+from mcp_common.http_cache import cache_key
+from mcp_common.metrics import UPSTREAM_IN_FLIGHT, UPSTREAM_RESPONSES
+
+def _response_from_entry(entry, url, cache_status):
+    import requests
+    from requests.structures import CaseInsensitiveDict
+    from urllib3.response import HTTPResponse
+    
+    headers = dict(entry.headers)
+    headers['x-cache'] = cache_status
+    response = requests.Response()
+    response.status_code = entry.status
+    response.url = url
+    response.headers = CaseInsensitiveDict(headers)
+    # Let urllib3 undo any content-encoding the body was stored with
+    response.raw = HTTPResponse(
+        body=io.BytesIO(entry.body),
+        headers=headers,
+        status=entry.status,
+        preload_content=False,
+        decode_content=True,
+    )
+    return response
+
+def cookie_header(cookies):
+    if not cookies:
+        return None
+    return '; '.join(f"{name}={value}" for name, value in sorted(cookies.items()))
+
+def override_base_url(url, base_url):
+    """`url` with scheme and host replaced by those of `base_url`."""
+    if not base_url:
+        return url
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+def _get(url, headers=None, cookies=None):
+    # requests is imported on first use so the server answers the MCP handshake sooner
+    import requests
+    
+    with UPSTREAM_IN_FLIGHT.track():
+        response = requests.get(url, headers=headers, cookies=cookies)
+    UPSTREAM_RESPONSES.inc(host=urlsplit(url).hostname, status=response.status_code)
+    return response
+
+def cached_get(url, headers=None, cookies=None, cache=None, base_url=None):
+    """`requests.get` that goes through `cache` (an HTTPCache) when one is given.
+
+    With `base_url` the request goes to that server instead, while the cache
+    still keys the response on `url`.
+    """
+    if cache is None:
+        return _get(override_base_url(url, base_url), headers=headers, cookies=cookies)
+
+    key = cache_key(url, vary=cookie_header(cookies))
+    entry = cache.lookup(key)
+
+    if entry is not None and entry.is_fresh(cache.ttl):
+        cache.stats['hits'] += 1
+        return _response_from_entry(entry, url, 'hit')
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        request_headers.update(entry.validators())
+
+    response = _get(override_base_url(url, base_url), headers=request_headers, cookies=cookies)
+
+    if response.status_code == 304 and entry is not None:
+        cache.refresh(key)
+        cache.stats['revalidated'] += 1
+        return _response_from_entry(entry, url, 'revalidated')
+
+    cache.stats['misses'] += 1
+    if response.status_code == 200:
+        from requests.structures import CaseInsensitiveDict
+        
+        # requests has already decoded the body, so it is stored without its content-encoding
+        stored_headers = {
+            name: value for name, value in response.headers.items() if name.lower() != 'content-encoding'
+        }
+        cache.store(key, response.status_code, CaseInsensitiveDict(stored_headers), response.content)
+    return response
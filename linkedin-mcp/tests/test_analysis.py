@@ -0,0 +1,63 @@
+import json
+
+import httpx
+import pytest
+
+from linkedin_mcp.server import linkedin_tools
+from mcp_common.executor import ToolExecutor
+
+PROFILE_URL = "https://www.linkedin.com/in/someone"
+PROFILE_PAGE = (
+    '<html><body><h1 class="text-heading-xlarge">Someone</h1>'
+    '<div class="text-body-medium">Engineer</div><span class="text-body-small">Berlin</span></body></html>'
+)
+ACTIVITY_PAGE = (
+    '<html><body><div class="feed-shared-update-v2">'
+    '<div class="feed-shared-update-v2__description">Shipping it #python</div>'
+    '<span class="social-details-social-counts__reactions-count">12</span>'
+    '<div class="feed-shared-image"></div></div></body></html>'
+)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_fetches_through_a_client_never_hold_a_worker_thread():
+    executor = ToolExecutor(max_workers=2)
+    seen = []
+
+    def upstream(request):
+        # Runs while the request is in flight, on the event loop
+        seen.append((request.url.path, request.headers.get("cookie"), executor.stats()['workers']['busy']))
+        page = ACTIVITY_PAGE if request.url.path.endswith("/recent-activity/shares/") else PROFILE_PAGE
+        return httpx.Response(200, text=page)
+
+    _, linkedin_tool = linkedin_tools(executor, client=httpx.AsyncClient(transport=httpx.MockTransport(upstream)))
+    content, = await linkedin_tool("linkedin_analyze", {
+        'url': PROFILE_URL, 'cookies': {'li_at': "token"}, 'output': "json",
+    })
+
+    result = json.loads(content.text)
+    assert result['profile']['name'] == "Someone"
+    assert result['posts'][0]['hashtags'] == ["python"]
+    assert result['analysis']['total_posts'] == 1
+    assert seen == [
+        ("/in/someone", "li_at=token", 0),
+        ("/in/someone/recent-activity/shares/", "li_at=token", 0),
+    ]
+
+
+@pytest.mark.anyio
+async def test_upstream_errors_are_reported_per_page():
+    def upstream(request):
+        return httpx.Response(403)
+
+    _, linkedin_tool = linkedin_tools(ToolExecutor(), client=httpx.AsyncClient(transport=httpx.MockTransport(upstream)))
+    content, = await linkedin_tool("linkedin_analyze", {'url': PROFILE_URL, 'output': "json"})
+
+    result = json.loads(content.text)
+    assert result['profile']['error'] == "Failed to fetch profile: HTTP 403"
+    assert result['posts']['error'] == "Failed to fetch activity: HTTP 403"
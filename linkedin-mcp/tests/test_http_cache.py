@@ -0,0 +1,87 @@
+import gzip
+import http.server
+import threading
+
+import pytest
+
+from linkedin_mcp.http_cache import cached_get
+from mcp_common.http_cache import HTTPCache
+
+PROFILE_URL = "https://www.linkedin.com/in/someone/"
+PAGE = "<html><body><h1>Someone</h1></body></html>"
+
+
+@pytest.fixture
+def upstream():
+    body = gzip.compress(PAGE.encode())
+    seen = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            seen.append(self.headers)
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.seen = seen
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def open_cache(tmp_path, ttl):
+    return HTTPCache(str(tmp_path / "http_cache.sqlite3"), ttl=ttl)
+
+
+def test_stale_entries_are_revalidated_and_served_decoded(tmp_path, upstream):
+    cache = open_cache(tmp_path, ttl=0.0)
+
+    first = cached_get(PROFILE_URL, cache=cache, base_url=upstream.base_url)
+    second = cached_get(PROFILE_URL, cache=cache, base_url=upstream.base_url)
+    cache.close()
+
+    assert first.text == second.text == PAGE
+    assert second.headers["x-cache"] == "revalidated"
+    assert "content-encoding" not in second.headers
+    assert [headers.get("If-None-Match") for headers in upstream.seen] == [None, '"v1"']
+    assert cache.stats == {'hits': 0, 'revalidated': 1, 'misses': 1}
+
+
+def test_fresh_entries_are_served_without_a_request(tmp_path, upstream):
+    cache = open_cache(tmp_path, ttl=60.0)
+
+    cached_get(PROFILE_URL, cache=cache, base_url=upstream.base_url)
+    hit = cached_get(PROFILE_URL, cache=cache, base_url=upstream.base_url)
+    cache.close()
+
+    assert hit.text == PAGE
+    assert hit.headers["x-cache"] == "hit"
+    assert len(upstream.seen) == 1
+
+
+def test_cookies_vary_the_cache_key(tmp_path, upstream):
+    cache = open_cache(tmp_path, ttl=60.0)
+
+    cached_get(PROFILE_URL, cache=cache, base_url=upstream.base_url)
+    cached_get(PROFILE_URL, cookies={'li_at': "token"}, cache=cache, base_url=upstream.base_url)
+    cache.close()
+
+    assert cache.stats['misses'] == 2
+    assert upstream.seen[1].get("Cookie") == "li_at=token"
@@ -0,0 +1,100 @@
+import anyio
+import click
+
+from mcp_common.http_app import HTTP_TRANSPORTS, serve_http
+from mcp_common.profiling import DEFAULT_PROFILE_DIR
+
+def apply_options(*options):
+    """Decorator applying click `options` in order, as if stacked above the command."""
+    def decorator(command):
+        for option in reversed(options):
+            command = option(command)
+        return command
+    return decorator
+
+# Options every server takes, main() receives them next to its own
+server_options = apply_options(
+    click.option("--port", default=8000, help="Port to listen on for SSE and streamable HTTP"),
+    click.option(
+        "--transport",
+        type=click.Choice(["stdio", *HTTP_TRANSPORTS]),
+        default="stdio",
+        help="Transport type",
+    ),
+    click.option(
+        "--workers",
+        envvar="MCP_WORKERS",
+        default=1,
+        help="Server processes answering streamable HTTP requests, each with its own connections and worker threads",
+    ),
+    click.option(
+        "--debug/--no-debug",
+        default=False,
+        help="Return tracebacks in HTTP error responses",
+    ),
+    click.option(
+        "--max-workers",
+        default=8,
+        help="Worker threads available for blocking parse and format work",
+    ),
+    click.option(
+        "--tool-concurrency",
+        default=4,
+        help="Maximum concurrent calls of a single tool, extra calls are queued",
+    ),
+    click.option(
+        "--cache/--no-cache",
+        default=False,
+        help="Keep upstream responses in a local SQLite cache shared with the other servers",
+    ),
+    click.option(
+        "--cache-path",
+        default=None,
+        help="Cache database file (default: $MCP_HTTP_CACHE_PATH or ~/.cache/mcp-ethical-hacking/http_cache.sqlite3)",
+    ),
+    click.option(
+        "--cache-ttl",
+        default=60.0,
+        help="Seconds a cached response is served before it is revalidated upstream",
+    ),
+    click.option(
+        "--cache-max-mb",
+        default=256,
+        help="Size budget of the cache, least recently used responses are evicted beyond it",
+    ),
+    click.option(
+        "--profile-rate",
+        envvar="MCP_PROFILE_RATE",
+        default=0.0,
+        help="Fraction of tool calls recorded with the stack sampler and tracemalloc (1 profiles every call)",
+    ),
+    click.option(
+        "--profile-dir",
+        envvar="MCP_PROFILE_DIR",
+        default=DEFAULT_PROFILE_DIR,
+        help="Directory receiving the collapsed stacks and allocation reports of profiled calls",
+    ),
+)
+
+def run_server(module, create_server, port, transport, workers, debug, **options):
+    """Serve `create_server(**options)` over `transport`.
+
+    HTTP transports build the app in each worker process from
+    `module:create_app`, stdio runs it in this process.
+    """
+    if workers > 1 and transport != "streamable-http":
+        raise click.UsageError("--workers needs --transport streamable-http, other transports keep sessions in one process")
+
+    if transport in HTTP_TRANSPORTS:
+        serve_http(f"{module}:create_app", {"transport": transport, "debug": debug, **options}, port, workers)
+        return
+
+    from mcp.server.stdio import stdio_server
+
+    app, init_options, serving, _ = create_server(**options)
+
+    async def arun():
+        async with serving(), stdio_server() as streams:
+            await app.run(streams[0], streams[1], init_options)
+
+    anyio.run(arun)
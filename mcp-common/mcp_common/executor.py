@@ -0,0 +1,83 @@
+import contextlib
+import sys
+import time
+
+import anyio
+import anyio.to_thread
+
+from mcp_common.profiling import profiled
+
+
+class ToolExecutor:
+    """Bounded worker pool for tool bodies.
+
+    Blocking work is pushed to worker threads capped at `max_workers`, and each
+    tool gets its own concurrency limit so one slow tool cannot starve the
+    others. Queue depth and time spent waiting for a slot are tracked per tool.
+    """
+
+    def __init__(self, max_workers=8, tool_concurrency=4, slow_wait_threshold=1.0):
+        self.max_workers = max_workers
+        self.tool_concurrency = tool_concurrency
+        self.slow_wait_threshold = slow_wait_threshold
+        self._workers = anyio.CapacityLimiter(max_workers)
+        self._tool_limiters = {}
+        self._tool_stats = {}
+
+    def _limiter_for(self, tool_name):
+        if tool_name not in self._tool_limiters:
+            self._tool_limiters[tool_name] = anyio.CapacityLimiter(self.tool_concurrency)
+            self._tool_stats[tool_name] = {
+                'calls': 0,
+                'total_wait': 0.0,
+                'max_wait': 0.0,
+            }
+        return self._tool_limiters[tool_name]
+
+    @contextlib.asynccontextmanager
+    async def tool_slot(self, tool_name):
+        limiter = self._limiter_for(tool_name)
+        stats = self._tool_stats[tool_name]
+        queued_at = time.monotonic()
+
+        async with limiter:
+            waited = time.monotonic() - queued_at
+            stats['calls'] += 1
+            stats['total_wait'] += waited
+            stats['max_wait'] = max(stats['max_wait'], waited)
+            if waited >= self.slow_wait_threshold:
+                print(
+                    f"{tool_name} waited {waited:.2f}s for a slot "
+                    f"({limiter.statistics().tasks_waiting} still queued)",
+                    file=sys.stderr,
+                )
+            yield
+
+    async def offload(self, func, *args):
+        return await anyio.to_thread.run_sync(profiled(func), *args, limiter=self._workers)
+
+    async def run_tool(self, tool_name, func, *args):
+        async with self.tool_slot(tool_name):
+            return await self.offload(func, *args)
+
+    def stats(self):
+        worker_stats = self._workers.statistics()
+        tools = {}
+        for tool_name, limiter in self._tool_limiters.items():
+            limiter_stats = limiter.statistics()
+            stats = self._tool_stats[tool_name]
+            tools[tool_name] = {
+                'in_flight': limiter_stats.borrowed_tokens,
+                'queued': limiter_stats.tasks_waiting,
+                'calls': stats['calls'],
+                'avg_wait': stats['total_wait'] / stats['calls'] if stats['calls'] else 0.0,
+                'max_wait': stats['max_wait'],
+            }
+        return {
+            'workers': {
+                'busy': worker_stats.borrowed_tokens,
+                'total': worker_stats.total_tokens,
+                'queued': worker_stats.tasks_waiting,
+            },
+            'tools': tools,
+        }
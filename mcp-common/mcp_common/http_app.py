@@ -0,0 +1,105 @@
+import contextlib
+import importlib
+import json
+import os
+
+HTTP_TRANSPORTS = ("sse", "streamable-http")
+# Set by serve_http for the worker processes, JSON of {"factory": "module:function", "settings": {...}}
+WORKER_SETTINGS_ENV = "MCP_WORKER_SETTINGS"
+
+STREAMABLE_HTTP_MISSING = "--transport streamable-http requires mcp>=1.8, install the 'streamable-http' extra"
+
+def _streamable_http_available():
+    try:
+        import mcp.server.streamable_http_manager  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def create_http_app(server, init_options, serving, stats, metrics, transport="sse", debug=False):
+    """Starlette app serving `server` over SSE or streamable HTTP, next to /stats and /metrics.
+
+    `serving` is an async context manager held for the lifetime of the app,
+    `stats` and `metrics` return the /stats JSON and the /metrics text.
+    Streamable HTTP is stateless: every POST to /mcp gets a fresh transport
+    and nothing outlives the request, so any worker process can answer it.
+    """
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, PlainTextResponse
+    from starlette.routing import Mount, Route
+
+    async def handle_stats(request):
+        return JSONResponse(stats())
+
+    async def handle_metrics(request):
+        return PlainTextResponse(metrics(), media_type="text/plain; version=0.0.4")
+
+    routes = [
+        Route("/stats", endpoint=handle_stats),
+        Route("/metrics", endpoint=handle_metrics),
+    ]
+
+    if transport == "streamable-http":
+        if not _streamable_http_available():
+            raise Exception(STREAMABLE_HTTP_MISSING)
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+        session_manager = StreamableHTTPSessionManager(server, stateless=True)
+
+        async def handle_mcp(scope, receive, send):
+            await session_manager.handle_request(scope, receive, send)
+
+        routes.append(Mount("/mcp", app=handle_mcp))
+
+        @contextlib.asynccontextmanager
+        async def lifespan(_starlette_app):
+            async with serving(), session_manager.run():
+                yield
+    else:
+        from mcp.server.sse import SseServerTransport
+
+        sse = SseServerTransport("/messages/")
+
+        async def handle_sse(request):
+            async with sse.connect_sse(
+                request.scope, request.receive, request._send
+            ) as streams:
+                await server.run(streams[0], streams[1], init_options)
+
+        routes.extend([
+            Route("/sse", endpoint=handle_sse),
+            Mount("/messages/", app=sse.handle_post_message),
+        ])
+
+        @contextlib.asynccontextmanager
+        async def lifespan(_starlette_app):
+            async with serving():
+                yield
+
+    return Starlette(debug=debug, lifespan=lifespan, routes=routes)
+
+def _load_factory(factory):
+    module_name, function_name = factory.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+def worker_app():
+    """App of one uvicorn worker process, built from the settings serve_http left in the environment."""
+    spec = json.loads(os.environ[WORKER_SETTINGS_ENV])
+    return _load_factory(spec["factory"])(**spec["settings"])
+
+def serve_http(factory, settings, port, workers=1):
+    """Run `factory(**settings)` with uvicorn, in `workers` processes when more than one.
+
+    `factory` is an import string ("package.module:function") because each
+    worker process builds its own app, so `settings` must be JSON.
+    """
+    import uvicorn
+
+    if settings.get("transport") == "streamable-http" and not _streamable_http_available():
+        # Checked before any worker process starts, uvicorn would restart failing workers forever
+        raise Exception(STREAMABLE_HTTP_MISSING)
+    if workers > 1:
+        os.environ[WORKER_SETTINGS_ENV] = json.dumps({"factory": factory, "settings": settings})
+        uvicorn.run(f"{__name__}:worker_app", factory=True, workers=workers, host="0.0.0.0", port=port)
+    else:
+        uvicorn.run(_load_factory(factory)(**settings), host="0.0.0.0", port=port)
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "mcp-ethical-hacking", "http_cache.sqlite3"
+)
+
+# Response headers kept alongside cached bodies
+STORED_HEADERS = ('content-type', 'content-encoding', 'etag', 'last-modified')
+# Seconds a hit may leave last_access stale, so hits on a recently used entry stay read-only
+ACCESS_RESOLUTION = 60.0
+
+def canonical_url(url):
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+def cache_key(url, vary=None):
+    key = canonical_url(url)
+    if vary:
+        # Responses fetched with credentials are only shared with the same credentials
+        key += '#' + hashlib.sha256(vary.encode('utf-8')).hexdigest()[:16]
+    return key
+
+class CacheEntry:
+    __slots__ = ('key', 'status', 'headers', 'body', 'stored_at')
+
+    def __init__(self, key, status, headers, body, stored_at):
+        self.key = key
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    def is_fresh(self, ttl):
+        return time.time() - self.stored_at < ttl
+
+    def validators(self):
+        conditional_headers = {}
+        if self.headers.get('etag'):
+            conditional_headers['If-None-Match'] = self.headers['etag']
+        if self.headers.get('last-modified'):
+            conditional_headers['If-Modified-Since'] = self.headers['last-modified']
+        return conditional_headers
+
+class HTTPCache:
+    """SQLite-backed response cache shared by every server on the host.
+
+    Entries are keyed by canonical URL (plus a credential hash when the
+    request carried cookies). An entry younger than `ttl` seconds is served
+    as is. Older entries are revalidated with If-None-Match /
+    If-Modified-Since. The least recently used entries are evicted once the
+    stored bodies exceed `max_bytes`. Eviction order is only kept to
+    ACCESS_RESOLUTION seconds, so most hits never write to the database.
+    """
+
+    def __init__(self, path=None, ttl=60.0, max_bytes=256 * 1024 * 1024):
+        self.path = path or os.environ.get('MCP_HTTP_CACHE_PATH') or DEFAULT_CACHE_PATH
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, status INTEGER, headers TEXT, body BLOB, '
+            'size INTEGER, stored_at REAL, last_access REAL)'
+        )
+        self._db.execute(
+            'CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)'
+        )
+        self._db.commit()
+
+    def lookup(self, key):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT status, headers, body, stored_at, last_access FROM responses WHERE key = ?',
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[4] >= ACCESS_RESOLUTION:
+                self._db.execute(
+                    'UPDATE responses SET last_access = ? WHERE key = ?', (now, key)
+                )
+                self._db.commit()
+        status, headers, body, stored_at, _ = row
+        return CacheEntry(key, status, json.loads(headers), body, stored_at)
+
+    def store(self, key, status, headers, body):
+        if len(body) > self.max_bytes:
+            return
+        stored_headers = {
+            name: headers[name] for name in STORED_HEADERS if headers.get(name) is not None
+        }
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, status, headers, body, size, stored_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, status, json.dumps(stored_headers), body, len(body), now, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def refresh(self, key):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?',
+                (now, now, key),
+            )
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            'SELECT key, size FROM responses ORDER BY last_access ASC'
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,240 @@
+import contextlib
+import functools
+import threading
+import time
+
+# Upper bounds in seconds, from a cache hit to a slow multi-request extraction
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(
+            f"{name}{_labels(self.labelnames, values, extra)} {_number(value)}"
+            for name, values, extra, value in self.samples()
+        )
+        return '\n'.join(lines)
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            series = list(self._series.items())
+        return [(self.name, values, (), value) for values, value in series]
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    @contextlib.contextmanager
+    def track(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self):
+        with self._lock:
+            series = list(self._series.items())
+        return [(self.name, values, (), value) for values, value in series]
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observed values (seconds by default)."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            series = [(values, list(counts), total, count) for values, (counts, total, count) in self._series.items()]
+        samples = []
+        for values, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", values, (('le', _number(float(bound))),), cumulative))
+            samples.append((f"{self.name}_bucket", values, (('le', '+Inf'),), count))
+            samples.append((f"{self.name}_sum", values, (), total))
+            samples.append((f"{self.name}_count", values, (), count))
+        return samples
+
+class CallbackMetric(_Metric):
+    """Gauge or counter read from existing state at scrape time.
+
+    `callback` returns (label values, value) pairs, so stats the servers
+    already keep (executor queues, cache counters) are exported without
+    being tracked twice.
+    """
+
+    def __init__(self, name, documentation, labelnames, callback, kind='gauge'):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self):
+        return [(self.name, tuple(map(str, values)), (), value) for values, value in self.callback()]
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name, documentation, labelnames, callback, kind='gauge'):
+        return self.register(CallbackMetric(name, documentation, labelnames, callback, kind))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+TOOL_CALL_SECONDS = REGISTRY.histogram(
+    'mcp_tool_call_seconds', 'Duration of MCP tool calls, queueing included', ('tool', 'status')
+)
+TOOL_CALLS_IN_PROGRESS = REGISTRY.gauge(
+    'mcp_tool_calls_in_progress', 'Tool calls received and not answered yet', ('tool',)
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    'mcp_stage_seconds', 'Time spent in each processing stage: fetch, parse, traverse, analysis, format', ('stage',)
+)
+UPSTREAM_RESPONSES = REGISTRY.counter(
+    'mcp_upstream_responses_total', 'Responses received from upstream hosts by status code', ('host', 'status')
+)
+UPSTREAM_IN_FLIGHT = REGISTRY.gauge('mcp_upstream_requests_in_flight', 'Upstream requests waiting for a response')
+
+# HTTPCache.stats keys and the result label they are exported as
+CACHE_RESULTS = {'hits': 'hit', 'revalidated': 'revalidated', 'misses': 'miss'}
+
+@contextlib.contextmanager
+def track_tool_call(tool):
+    status = 'ok'
+    started = time.perf_counter()
+    TOOL_CALLS_IN_PROGRESS.inc(tool=tool)
+    try:
+        yield
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        TOOL_CALLS_IN_PROGRESS.dec(tool=tool)
+        TOOL_CALL_SECONDS.observe(time.perf_counter() - started, tool=tool, status=status)
+
+def stage_timer(stage):
+    return STAGE_SECONDS.time(stage=stage)
+
+def timed(stage, func):
+    """`func` recording its run time under `stage`, for work handed to worker threads."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with STAGE_SECONDS.time(stage=stage):
+            return func(*args, **kwargs)
+    return wrapper
+
+def register_executor_metrics(executor, registry=REGISTRY):
+    def tool_values(field):
+        return lambda: [((tool,), stats[field]) for tool, stats in executor.stats()['tools'].items()]
+
+    registry.callback('mcp_tool_slots_in_use', 'Calls holding a tool concurrency slot', ('tool',), tool_values('in_flight'))
+    registry.callback('mcp_tool_slots_queued', 'Calls waiting for a tool concurrency slot', ('tool',), tool_values('queued'))
+    registry.callback(
+        'mcp_worker_threads_busy', 'Worker threads running blocking work', (),
+        lambda: [((), executor.stats()['workers']['busy'])],
+    )
+
+def register_cache_metrics(cache, registry=REGISTRY):
+    def ratio():
+        lookups = sum(cache.stats.values())
+        served = cache.stats['hits'] + cache.stats['revalidated']
+        return [((), served / lookups if lookups else 0.0)]
+
+    registry.callback(
+        'mcp_http_cache_lookups_total', 'HTTP cache lookups by result (hit, revalidated, miss)', ('result',),
+        lambda: [((CACHE_RESULTS[key],), count) for key, count in cache.stats.items()],
+        kind='counter',
+    )
+    registry.callback(
+        'mcp_http_cache_hit_ratio', 'Share of cache lookups answered without downloading the body', (), ratio
+    )
@@ -0,0 +1,39 @@
+import inspect
+
+import mcp.types as types
+
+LOG_LEVELS = ('debug', 'info', 'notice', 'warning', 'error', 'critical', 'alert', 'emergency')
+PARTIAL_RESULT_LEVEL = 'info'
+
+class PartialResults:
+    """Sends parts of a tool result while the call is still running.
+
+    Parts go out as `notifications/message` log messages (logger = the tool
+    name) tied to the request, so on streamable HTTP they travel on the
+    call's own response stream. Only calls that carry a progress token get
+    them, and a client can turn them off with `logging/setLevel` above
+    `info`. The final result still holds everything, for clients that only
+    read results. Registers the server's logging/setLevel handler.
+    """
+
+    def __init__(self, app):
+        self.level = PARTIAL_RESULT_LEVEL
+
+        @app.set_logging_level()
+        async def set_logging_level(level: types.LoggingLevel) -> None:
+            self.level = level
+
+    def wanted(self, request_context):
+        if request_context.meta is None or request_context.meta.progressToken is None:
+            return False
+        return LOG_LEVELS.index(self.level) <= LOG_LEVELS.index(PARTIAL_RESULT_LEVEL)
+
+    async def send(self, request_context, tool_name, text):
+        if not self.wanted(request_context):
+            return
+        session = request_context.session
+        options = {}
+        # Older mcp releases have no way to route a notification to its request
+        if 'related_request_id' in inspect.signature(session.send_log_message).parameters:
+            options['related_request_id'] = request_context.request_id
+        await session.send_log_message(PARTIAL_RESULT_LEVEL, text, logger=tool_name, **options)
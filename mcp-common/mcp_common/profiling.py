@@ -0,0 +1,242 @@
+import collections
+import contextvars
+import functools
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+DEFAULT_PROFILE_DIR = "profiles"
+# Seconds between stack samples of a profiled call
+SAMPLE_INTERVAL = 0.002
+TOP_ALLOCATIONS = 25
+
+_current_session = contextvars.ContextVar('profile_session', default=None)
+_tracemalloc_users = 0
+_tracemalloc_lock = threading.Lock()
+_session_ids = itertools.count(1)
+
+def profiled(func):
+    """`func` traced as part of the current profiled call, if there is one.
+
+    Used for work handed to worker threads, the check is a single context
+    variable lookup when profiling is off.
+    """
+    session = _current_session.get()
+    if session is None:
+        return func
+    return session.wrap(func)
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _c_function_label(func):
+    module = getattr(func, '__module__', None)
+    qualname = getattr(func, '__qualname__', repr(func))
+    return f"{module}.{qualname} (C)" if module else f"{qualname} (C)"
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+class _ThreadTracer:
+    # sys.setprofile hook timing every call stack of one thread, C calls included
+    def __init__(self, root_label):
+        self.times = collections.Counter()
+        self._labels = [root_label]
+        self._started = [time.perf_counter()]
+        self._children = [0.0]
+
+    def __call__(self, frame, event, arg):
+        if event == 'call':
+            self._push(_frame_label(frame))
+        elif event == 'c_call':
+            self._push(_c_function_label(arg))
+        else:
+            self._pop()
+
+    def _push(self, label):
+        self._labels.append(label)
+        self._started.append(time.perf_counter())
+        self._children.append(0.0)
+
+    def _pop(self):
+        if len(self._labels) == 1:
+            return
+        elapsed = time.perf_counter() - self._started.pop()
+        self.times[';'.join(self._labels)] += elapsed - self._children.pop()
+        self._labels.pop()
+        self._children[-1] += elapsed
+
+    def finish(self):
+        # Whatever is still open is the call that removed the hook
+        del self._labels[1:], self._started[1:], self._children[1:]
+        return self.times
+
+class ProfileSession:
+    """Stack sampler and allocation tracker for one tool call.
+
+    A background thread samples the event loop thread while it runs the
+    call's coroutine. The sampler only runs when it gets the GIL, so it
+    misses time spent in long C calls, and functions wrapped with
+    `profiled` (the parse and format work on worker threads) are traced
+    deterministically instead, with the wall time of every stack. Stacks
+    are written in collapsed format (one `frame;frame;frame count` line per
+    stack), which flamegraph.pl, speedscope and inferno read directly.
+    tracemalloc is process-wide, so the allocation report also contains
+    whatever concurrent calls allocated meanwhile.
+    """
+
+    def __init__(self, tool_name, directory, interval=SAMPLE_INTERVAL):
+        self.tool_name = tool_name
+        self.directory = directory
+        self.interval = interval
+        self.session_id = next(_session_ids)
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.worker_times = collections.Counter()
+        self._worker_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._root_frame = None
+        self._loop_thread = None
+        self._token = None
+
+    def wrap(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _ThreadTracer('worker')
+            previous = sys.getprofile()
+            sys.setprofile(tracer)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                sys.setprofile(previous)
+                times = tracer.finish()
+                with self._worker_lock:
+                    self.worker_times.update(times)
+        return wrapper
+
+    def __enter__(self):
+        # The frame of the coroutine that opened the session, loop thread stacks without it belong to other calls
+        self._root_frame = sys._getframe(1)
+        self._loop_thread = threading.get_ident()
+        self._token = _current_session.set(self)
+        _start_tracemalloc()
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.take_snapshot()
+        self.started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample, name=f"profiler-{self.session_id}", daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self.started
+        self._stop.set()
+        self._sampler.join()
+        # Leave out what the sampler itself allocated
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, __file__)])
+        _, peak = tracemalloc.get_traced_memory()
+        _stop_tracemalloc()
+        _current_session.reset(self._token)
+        try:
+            self._write(snapshot, peak)
+        except OSError as e:
+            print(f"Could not write profile of {self.tool_name}: {str(e)}", file=sys.stderr)
+        return False
+
+    def _stack(self, frame, root=None):
+        labels = []
+        found_root = root is None
+        while frame is not None:
+            labels.append(_frame_label(frame))
+            if frame is root:
+                found_root = True
+                break
+            frame = frame.f_back
+        if not found_root:
+            return None
+        return ';'.join(reversed(labels))
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            stack = self._stack(sys._current_frames().get(self._loop_thread), self._root_frame)
+            if stack:
+                self.stacks[stack] += 1
+
+    def _write(self, snapshot, peak):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(self.directory, f"{stamp}-{self.tool_name}-{os.getpid()}-{self.session_id}")
+
+        with open(f"{base}.collapsed", 'w') as stacks_file:
+            for stack, count in self.stacks.most_common():
+                stacks_file.write(f"{stack} {count}\n")
+
+        # Microseconds, so the weights stay integers for flamegraph.pl
+        with open(f"{base}.workers.collapsed", 'w') as workers_file:
+            for stack, seconds in self.worker_times.most_common():
+                microseconds = round(seconds * 1_000_000)
+                if microseconds:
+                    workers_file.write(f"{stack} {microseconds}\n")
+
+        # The sampler needs the GIL for every sample, the real interval can be far longer than requested
+        actual_interval = self.elapsed / self.samples if self.samples else self.elapsed
+        with open(f"{base}.alloc.txt", 'w') as alloc_file:
+            alloc_file.write(
+                f"{self.tool_name}: {self.elapsed:.3f}s, peak traced memory {peak / 1024 / 1024:.1f} MiB\n"
+                f"Event loop: {self.samples} samples taken, {sum(self.stacks.values())} inside the call, "
+                f"one every {actual_interval * 1000:.1f} ms on average ({self.interval * 1000:.1f} ms requested)\n"
+                f"Worker threads: {sum(self.worker_times.values()):.3f}s traced, in microseconds\n\n"
+                f"Top {TOP_ALLOCATIONS} allocation sites still alive at the end of the call:\n"
+            )
+            for stat in snapshot.compare_to(self._baseline, 'lineno')[:TOP_ALLOCATIONS]:
+                alloc_file.write(f"{stat}\n")
+
+        print(
+            f"Profile of {self.tool_name} written to {base}.collapsed, {base}.workers.collapsed and {base}.alloc.txt",
+            file=sys.stderr,
+        )
+
+class _NoProfile:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+NO_PROFILE = _NoProfile()
+
+class CallProfiler:
+    """Decides which tool calls are profiled.
+
+    `sample_rate` is the fraction of calls profiled (1 for every call, 0 to
+    turn profiling off). Off, `profile()` returns a shared no-op context.
+    """
+
+    def __init__(self, sample_rate=0.0, directory=DEFAULT_PROFILE_DIR):
+        self.sample_rate = sample_rate
+        self.directory = directory
+
+    def profile(self, tool_name):
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return NO_PROFILE
+        if _current_session.get() is not None:
+            # Nested tool work is already covered by the outer session
+            return NO_PROFILE
+        return ProfileSession(tool_name, self.directory)
@@ -0,0 +1,27 @@
+import json
+
+def _orjson():
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+orjson = _orjson()
+
+def _default(value):
+    to_dict = getattr(value, 'to_dict', None)
+    if to_dict is not None:
+        return to_dict()
+    return str(value)
+
+def dumps_bytes(value):
+    """Compact UTF-8 JSON, encoded with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        value, default=_default, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+def dumps(value):
+    return dumps_bytes(value).decode('utf-8')
@@ -0,0 +1,45 @@
+import json
+
+import anyio.to_thread
+import pytest
+
+from mcp_common.profiling import CallProfiler, profiled
+
+DOCUMENT = json.dumps([{"id": index, "body": "x" * 50} for index in range(50_000)])
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def parse(document):
+    return json.loads(document)
+
+
+@pytest.mark.anyio
+async def test_worker_threads_are_traced_call_by_call(tmp_path):
+    profiler = CallProfiler(sample_rate=1.0, directory=str(tmp_path))
+
+    with profiler.profile("parse") as session:
+        parsed = await anyio.to_thread.run_sync(profiled(parse), DOCUMENT)
+
+    assert len(parsed) == 50_000
+    parse_stacks = {stack: seconds for stack, seconds in session.worker_times.items() if "loads (" in stack}
+    assert parse_stacks
+    assert sum(parse_stacks.values()) > 0.5 * sum(session.worker_times.values())
+
+    workers_file, = tmp_path.glob("*-parse-*.workers.collapsed")
+    lines = workers_file.read_text().splitlines()
+    assert all(line.startswith("worker;") and line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+    alloc_file, = tmp_path.glob("*-parse-*.alloc.txt")
+    header = alloc_file.read_text().splitlines()[1]
+    assert f"{session.samples} samples taken" in header
+    assert "ms requested" in header
+
+
+@pytest.mark.anyio
+async def test_work_outside_a_profiled_call_is_not_traced():
+    assert profiled(parse) is parse
+    assert CallProfiler(sample_rate=0.0).profile("parse").__enter__() is None
@@ -0,0 +1,228 @@
+import sys
+
+from reddit_mcp.comments import Comment, _parse_iso_timestamp, _relative_permalink
+
+HTML_PARSER_BACKENDS = ('lxml', 'bs4')
+
+def _lxml_available():
+    try:
+        import lxml.etree  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def default_backend():
+    return 'lxml' if _lxml_available() else 'bs4'
+
+def _parse_score_text(score_text):
+    return int(score_text.split(' ')[0]) if score_text[:1].isdigit() else 0
+
+def _text_of(element):
+    return ''.join(element.itertext())
+
+def _comment_key(id_attr, index):
+    comment_id = id_attr.replace('thing_t1_', '') if id_attr.startswith('thing_t1_') else ''
+    # Comments without a thing id still need a key so their replies can point at them
+    return comment_id or f"html-{index}"
+
+class CommentWalker:
+    """Single-pass extraction of old-reddit comments from parser events.
+
+    Consumes `(event, element)` pairs ('start' / 'end', lxml elements) in
+    document order and keeps a stack of the comments currently open. Every
+    field goes to the innermost open comment, the first time it is seen, so
+    each node is inspected once instead of running a subtree query per field
+    per comment. Comments come out of `feed` in pre-order as soon as their
+    own entry has been parsed.
+    """
+    
+    # The only elements that carry comment structure or fields
+    TAGS = ('div', 'a', 'span', 'time')
+    
+    def __init__(self):
+        self._open = []
+        self._index = 0
+    
+    @property
+    def open_depth(self):
+        return len(self._open)
+    
+    def _emit(self, record):
+        comment = record[0]
+        record[3] = True
+        if comment.author is None:
+            comment.author = '[deleted]'
+        if comment.text is None:
+            comment.text = ''
+        if comment.score is None:
+            comment.score = 0
+        if comment.path is None:
+            comment.path = ''
+        return comment
+    
+    def feed(self, event, element):
+        tag = element.tag
+        if not isinstance(tag, str):
+            return None
+        
+        if event == 'start':
+            if tag == 'div':
+                classes = (element.get('class') or '').split()
+                if 'comment' in classes:
+                    return self._open_comment(element)
+                if self._open and 'entry' in classes and self._open[-1][2] is None:
+                    self._open[-1][2] = element
+            elif not self._open:
+                return None
+            elif tag == 'a':
+                comment = self._open[-1][0]
+                if comment.path is None and 'bylink' in (element.get('class') or '').split():
+                    comment.path = _relative_permalink(element.get('href', ''))
+            elif tag == 'time':
+                comment = self._open[-1][0]
+                if comment.created is None:
+                    comment.created = _parse_iso_timestamp(element.get('datetime', ''))
+            return None
+        
+        if not self._open:
+            return None
+        record = self._open[-1]
+        comment = record[0]
+        
+        if tag == 'div':
+            if element is record[1]:
+                self._open.pop()
+                return None if record[3] else self._emit(record)
+            if element is record[2] and not record[3]:
+                return self._emit(record)
+            if comment.text is None and 'md' in (element.get('class') or '').split():
+                comment.text = _text_of(element).strip()
+        elif tag == 'a':
+            if comment.author is None and 'author' in (element.get('class') or '').split():
+                comment.author = _text_of(element)
+        elif tag == 'span':
+            if comment.score is None and 'score' in (element.get('class') or '').split():
+                comment.score = _parse_score_text(_text_of(element))
+        return None
+    
+    def _open_comment(self, element):
+        parent_id = None
+        depth = 0
+        parent_ready = None
+        if self._open:
+            parent = self._open[-1]
+            parent_id = parent[0].id
+            depth = parent[0].depth + 1
+            # Keep pre-order even when the parent had no div.entry of its own
+            if not parent[3]:
+                parent_ready = self._emit(parent)
+        
+        comment = Comment(
+            _comment_key(element.get('id', ''), self._index),
+            parent_id,
+            depth,
+            None,
+            None,
+            None,
+            None,
+            path=None,
+            controversiality=1 if 'controversial' in (element.get('class') or '').split() else 0,
+        )
+        self._index += 1
+        # [comment, comment element, entry element, emitted]
+        self._open.append([comment, element, None, False])
+        return parent_ready
+    
+    def close(self):
+        """Flush comments left open by truncated markup."""
+        remaining = [self._emit(record) for record in self._open if not record[3]]
+        self._open = []
+        return remaining
+
+def _parse_with_lxml(page_html):
+    from lxml import etree
+    
+    # Plain etree elements skip lxml.html's per-element class lookup
+    root = etree.fromstring(page_html, etree.HTMLParser())
+    if root is None:
+        return []
+    
+    walker = CommentWalker()
+    all_comments = []
+    for event, element in etree.iterwalk(root, events=('start', 'end'), tag=CommentWalker.TAGS):
+        comment = walker.feed(event, element)
+        if comment is not None:
+            all_comments.append(comment)
+    all_comments.extend(walker.close())
+    return all_comments
+
+def _parse_with_bs4(page_html):
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(page_html, 'html.parser')
+    
+    all_comments = []
+    comment_elements = soup.select('div.comment')
+    # Keyed by id() of the element, gives (comment key, depth) for ancestors
+    element_keys = {}
+    
+    for index, element in enumerate(comment_elements):
+        try:
+            author_element = element.select_one('a.author')
+            author = author_element.text if author_element else '[deleted]'
+            
+            body_element = element.select_one('div.md')
+            text = body_element.text.strip() if body_element else ''
+            
+            comment_key = _comment_key(element.get('id', ''), index)
+            controversiality = 1 if 'controversial' in (element.get('class') or []) else 0
+            
+            score_element = element.select_one('span.score')
+            score = _parse_score_text(score_element.text if score_element else '0 points')
+            
+            parent_id = None
+            depth = 0
+            parent_element = element.find_parent('div', class_='comment')
+            if parent_element is not None and id(parent_element) in element_keys:
+                parent_id, parent_depth = element_keys[id(parent_element)]
+                depth = parent_depth + 1
+            element_keys[id(element)] = (comment_key, depth)
+            
+            permalink_element = element.select_one('a.bylink')
+            permalink = permalink_element.get('href', '') if permalink_element else ''
+            
+            time_element = element.select_one('time')
+            timestamp = time_element.get('datetime', '') if time_element else ''
+            
+            comment_info = Comment(
+                comment_key,
+                parent_id,
+                depth,
+                author,
+                _parse_iso_timestamp(timestamp),
+                text,
+                score,
+                path=_relative_permalink(permalink),
+                controversiality=controversiality,
+            )
+            
+            all_comments.append(comment_info)
+            
+        except Exception as e:
+            print(f"Parser error: {str(e)}", file=sys.stderr)
+    
+    return all_comments
+
+def parse_comments_html(page_html, backend=None):
+    """Parse the comments of an old-reddit thread page.
+
+    `backend` is 'lxml' (single pass over the document) or 'bs4' (the
+    BeautifulSoup/CSS selector parser), defaulting to lxml when it is
+    installed.
+    """
+    backend = backend or default_backend()
+    if backend == 'lxml':
+        return _parse_with_lxml(page_html)
+    if backend == 'bs4':
+        return _parse_with_bs4(page_html)
+    raise ValueError(f"Unknown HTML parser backend: {backend}")
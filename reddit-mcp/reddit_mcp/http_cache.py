@@ -0,0 +1,91 @@
+import anyio.to_thread
+import httpx
+
+from mcp_common.http_cache import cache_key
+
+class _TeeStream(httpx.AsyncByteStream):
+    # Hands chunks to the caller as they arrive and stores the complete body at the end
+    def __init__(self, stream, cache, key, status, headers):
+        self._stream = stream
+        self._cache = cache
+        self._key = key
+        self._status = status
+        self._headers = headers
+        self._chunks = []
+        self._size = 0
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            if self._chunks is not None:
+                self._size += len(chunk)
+                if self._size > self._cache.max_bytes:
+                    self._chunks = None
+                else:
+                    self._chunks.append(chunk)
+            yield chunk
+
+        if self._chunks is not None:
+            body = b''.join(self._chunks)
+            self._chunks = None
+            await anyio.to_thread.run_sync(
+                self._cache.store, self._key, self._status, self._headers, body
+            )
+
+    async def aclose(self):
+        await self._stream.aclose()
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that serves GETs from an HTTPCache when possible.
+
+    Bodies are stored as received on the wire (still content-encoded), so a
+    hit costs one SQLite read and no download. A miss is streamed through to
+    the caller unchanged while being recorded. Requests sent with
+    `Cache-Control: no-cache` are always revalidated with upstream.
+    """
+
+    def __init__(self, transport, cache):
+        self._transport = transport
+        self.cache = cache
+
+    def _cached_response(self, entry, request, cache_status):
+        headers = dict(entry.headers)
+        headers['x-cache'] = cache_status
+        return httpx.Response(entry.status, headers=headers, content=entry.body, request=request)
+
+    async def handle_async_request(self, request):
+        if request.method != 'GET':
+            return await self._transport.handle_async_request(request)
+
+        key = cache_key(str(request.url), vary=request.headers.get('cookie'))
+        entry = await anyio.to_thread.run_sync(self.cache.lookup, key)
+
+        no_cache = 'no-cache' in request.headers.get('cache-control', '').lower()
+        if entry is not None and not no_cache and entry.is_fresh(self.cache.ttl):
+            self.cache.stats['hits'] += 1
+            return self._cached_response(entry, request, 'hit')
+
+        if entry is not None:
+            request.headers.update(entry.validators())
+
+        response = await self._transport.handle_async_request(request)
+
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            await anyio.to_thread.run_sync(self.cache.refresh, key)
+            self.cache.stats['revalidated'] += 1
+            return self._cached_response(entry, request, 'revalidated')
+
+        self.cache.stats['misses'] += 1
+        if response.status_code != 200:
+            return response
+
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_TeeStream(response.stream, self.cache, key, response.status_code, response.headers),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
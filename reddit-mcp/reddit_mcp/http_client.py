@@ -0,0 +1,169 @@
+import http.cookiejar
+import sys
+
+import anyio
+import anyio.to_thread
+import httpx
+
+from reddit_mcp.http_cache import CachingTransport
+from reddit_mcp.rate_limit import RateLimitedTransport, RateLimiter
+
+BROWSER_SIGNATURE = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _accept_encoding():
+    encodings = ["gzip", "deflate"]
+    for module_name in ("brotli", "brotlicffi"):
+        try:
+            __import__(module_name)
+        except ImportError:
+            continue
+        encodings.append("br")
+        break
+    return ", ".join(encodings)
+
+
+class RejectCookies(http.cookiejar.DefaultCookiePolicy):
+    """Cookie policy of the shared clients: nothing a response sets is kept.
+
+    Reddit rotates tracking cookies (loid, session_tracker) on every
+    response. Kept in the jar, they would be sent with every later request,
+    where they change the cache key of each one and leak between calls.
+    """
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+class LazyTransport(httpx.AsyncBaseTransport):
+    """Builds the wrapped transport on the first request.
+
+    Creating an HTTP transport loads the CA bundle into an SSL context,
+    about 0.1s that would otherwise delay every server launch before it can
+    answer `initialize`. It is built once in a worker thread instead.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._transport = None
+        self._lock = anyio.Lock()
+
+    async def _get_transport(self):
+        if self._transport is None:
+            async with self._lock:
+                if self._transport is None:
+                    self._transport = await anyio.to_thread.run_sync(self._factory)
+        return self._transport
+
+    async def handle_async_request(self, request):
+        transport = await self._get_transport()
+        return await transport.handle_async_request(request)
+
+    async def aclose(self):
+        if self._transport is not None:
+            await self._transport.aclose()
+
+
+class UpstreamOverrideTransport(httpx.AsyncBaseTransport):
+    """Sends every request to `base_url` instead of the host it names.
+
+    Only scheme, host and port are replaced, path and query are kept, so a
+    local stand-in can serve reddit.com URLs for load tests. It sits below
+    the cache, which keeps keying responses on the real URLs.
+    """
+
+    def __init__(self, transport, base_url):
+        self._transport = transport
+        self.base_url = httpx.URL(base_url)
+
+    async def handle_async_request(self, request):
+        request.url = request.url.copy_with(
+            scheme=self.base_url.scheme, host=self.base_url.host, port=self.base_url.port
+        )
+        request.headers['Host'] = request.url.netloc.decode('ascii')
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def create_connection_pool(
+    http2=False,
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=30.0,
+):
+    """The pooled transport at the bottom of a client's transport stack.
+
+    Clients built on the same pool share its connections and limits, which
+    is how the combined server gives reddit and linkedin one pool to tune.
+    """
+    if http2 and not _http2_available():
+        print("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1", file=sys.stderr)
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    return LazyTransport(lambda: httpx.AsyncHTTPTransport(http2=http2, limits=limits))
+
+
+def create_http_client(
+    http2=False,
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=30.0,
+    timeout=30.0,
+    cache=None,
+    rate_limiter=None,
+    max_retries=3,
+    upstream_base_url=None,
+    pool=None,
+    cookies=None,
+):
+    """Build the long-lived client shared by every tool call of the process.
+
+    Connections are kept alive between calls so repeated fetches against
+    reddit.com skip the TCP and TLS handshakes. HTTP/2 and brotli are only
+    negotiated when the optional `h2` / `brotli` packages are installed.
+    Requests that reach the network are paced by `rate_limiter` (a
+    RateLimiter, a default one is created when omitted) and retried on 429
+    and 5xx; cache hits do not count against the limit.
+    GET requests go through `cache` (an HTTPCache) when one is given.
+    With `upstream_base_url`, requests go to that server instead of reddit.
+    `pool` (from create_connection_pool) replaces the client's own pool and
+    its connection settings. Cookies set by responses are dropped unless a
+    `cookies` jar is given, so only cookies the caller sends itself reach
+    the upstream and the cache key.
+    """
+    transport = pool
+    if transport is None:
+        transport = create_connection_pool(http2, max_connections, max_keepalive_connections, keepalive_expiry)
+    if upstream_base_url:
+        transport = UpstreamOverrideTransport(transport, upstream_base_url)
+    transport = RateLimitedTransport(
+        transport, rate_limiter or RateLimiter(), max_retries=max_retries
+    )
+    if cache is not None:
+        transport = CachingTransport(transport, cache)
+
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(timeout),
+        headers={
+            'User-Agent': BROWSER_SIGNATURE,
+            'Accept-Encoding': _accept_encoding(),
+        },
+        cookies=cookies if cookies is not None else http.cookiejar.CookieJar(RejectCookies()),
+        follow_redirects=True,
+    )
@@ -0,0 +1,173 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from mcp_common.http_cache import DEFAULT_CACHE_PATH
+
+# Rough size of a token in English text, used to turn token budgets into characters
+CHARS_PER_TOKEN = 4
+# Approximate resident bytes of a Comment besides its text, as measured in the Comment docstring
+COMMENT_OVERHEAD = 126
+# Requests behind continuation cursors, shared by the server processes on the host
+DEFAULT_CURSOR_LOG_PATH = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), "continuations.sqlite3")
+
+def budget_from_arguments(arguments, default):
+    if arguments.get("max_chars"):
+        return max(1, int(arguments["max_chars"]))
+    if arguments.get("max_tokens"):
+        return max(1, int(arguments["max_tokens"])) * CHARS_PER_TOKEN
+    return default
+
+class OutputBuilder:
+    """Collects output parts up to a character budget and joins them once."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.parts = []
+        self.size = 0
+
+    @property
+    def remaining(self):
+        return self.budget - self.size
+
+    def fits(self, text):
+        return len(text) <= self.remaining
+
+    def add(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+
+    def build(self):
+        return ''.join(self.parts)
+
+def estimate_size(data):
+    """Approximate resident bytes of an extracted thread held for its continuation cursors."""
+    discussion = data.get('discussion') or {}
+    size = sum(len(value) for value in discussion.values() if isinstance(value, str))
+    size += sum(COMMENT_OVERHEAD + len(comment.text or '') for comment in data.get('comments') or ())
+    # Ancestor lists of top_k results point at comments already counted
+    size += 64 * sum(len(ancestors) + 1 for ancestors in (data.get('context') or {}).values())
+    return size
+
+class ContinuationStore:
+    """Server-side state behind continuation cursors.
+
+    A cursor is an opaque random token mapped to the extracted thread, the
+    index of the next comment to render and the extraction request, so
+    following pages never refetch the thread. Entries expire after `ttl`
+    seconds, and the least recently used ones are dropped beyond
+    `max_entries`. Once the threads held add up to more than `max_bytes`
+    (see `estimate_size`), the least recently used entries let go of their
+    thread but keep the request, and the thread is extracted again if the
+    cursor comes back. The pages of one thread share its data, which is only
+    counted once.
+    """
+
+    def __init__(self, max_entries=1024, ttl=1800.0, max_bytes=128 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size = 0
+        # cursor -> [created, data or None once released, start, request]
+        self._entries = OrderedDict()
+        # id(data) -> [size, cursors holding it]
+        self._data_sizes = {}
+
+    def new_cursor(self):
+        return secrets.token_urlsafe(16)
+
+    def put(self, data, start, cursor=None, request=None):
+        cursor = cursor or self.new_cursor()
+        if cursor in self._entries:
+            self._remove(cursor)
+        held = self._data_sizes.get(id(data))
+        if held is None:
+            held = self._data_sizes[id(data)] = [estimate_size(data), 0]
+            self.size += held[0]
+        held[1] += 1
+        self._entries[cursor] = [time.monotonic(), data, start, request]
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        if self.size > self.max_bytes:
+            for entry in self._entries.values():
+                self._release(entry)
+                if self.size <= self.max_bytes:
+                    break
+        return cursor
+
+    def _release(self, entry):
+        data = entry[1]
+        if data is None:
+            return
+        entry[1] = None
+        held = self._data_sizes[id(data)]
+        held[1] -= 1
+        if held[1] == 0:
+            del self._data_sizes[id(data)]
+            self.size -= held[0]
+
+    def _remove(self, cursor):
+        self._release(self._entries.pop(cursor))
+
+    def get(self, cursor):
+        """(data, start, request) of `cursor`, data is None once released. None for unknown cursors."""
+        entry = self._entries.get(cursor)
+        if entry is None:
+            return None
+        created, data, start, request = entry
+        if time.monotonic() - created > self.ttl:
+            self._remove(cursor)
+            return None
+        self._entries.move_to_end(cursor)
+        return data, start, request
+
+class CursorLog:
+    """Requests behind continuation cursors, in a SQLite file the server processes share.
+
+    With several streamable HTTP workers, a cursor can come back to a
+    worker that did not issue it. That worker looks up the request and the
+    next start here and extracts the thread again. Rows expire after `ttl`
+    seconds.
+    """
+
+    def __init__(self, path=None, ttl=1800.0):
+        self.path = path or os.environ.get('MCP_CURSOR_LOG_PATH') or DEFAULT_CURSOR_LOG_PATH
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS cursors ('
+            'cursor TEXT PRIMARY KEY, request TEXT, start INTEGER, created REAL)'
+        )
+        self._db.commit()
+
+    def put(self, cursor, request, start):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO cursors (cursor, request, start, created) VALUES (?, ?, ?, ?)',
+                (cursor, json.dumps(request), start, now),
+            )
+            self._db.execute('DELETE FROM cursors WHERE created < ?', (now - self.ttl,))
+            self._db.commit()
+
+    def get(self, cursor):
+        """(request, start) logged for `cursor`, or None."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT request, start, created FROM cursors WHERE cursor = ?', (cursor,)
+            ).fetchone()
+        if row is None or time.time() - row[2] > self.ttl:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
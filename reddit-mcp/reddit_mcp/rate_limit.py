@@ -0,0 +1,156 @@
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import anyio
+import httpx
+
+from mcp_common.metrics import UPSTREAM_IN_FLIGHT, UPSTREAM_RESPONSES
+
+def _float_header(headers, name):
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class RateLimiter:
+    """Process-wide token bucket for upstream requests.
+
+    Requests queue in arrival order for a token. The refill rate starts at
+    `rate` per second and is re-derived from every response carrying
+    X-Ratelimit-Remaining / X-Ratelimit-Reset, so the remaining budget is
+    spread evenly over what is left of the window. When the budget is spent,
+    or a Retry-After arrives, every request waits until the window resets.
+    A server running in several processes gives each one a `share` of the
+    rate, burst and remaining budget.
+    """
+
+    def __init__(self, rate=10.0, burst=10, min_rate=0.05, share=1.0):
+        self.share = share
+        self.rate = rate * share
+        self.burst = max(1.0, burst * share)
+        self.min_rate = min_rate
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = anyio.Lock()
+        self._stats = {'requests': 0, 'delayed': 0, 'total_wait': 0.0, 'retries': 0}
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        queued_at = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await anyio.sleep(self._paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                await anyio.sleep((1 - self._tokens) / self.rate)
+
+        waited = time.monotonic() - queued_at
+        self._stats['requests'] += 1
+        self._stats['total_wait'] += waited
+        if waited > 0.01:
+            self._stats['delayed'] += 1
+
+    def pause(self, seconds):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers):
+        remaining = _float_header(headers, 'x-ratelimit-remaining')
+        reset = _float_header(headers, 'x-ratelimit-reset')
+        if remaining is None or reset is None:
+            return
+
+        self._refill(time.monotonic())
+        if remaining < 1:
+            self.pause(reset)
+            return
+        remaining *= self.share
+        self.rate = max(self.min_rate, remaining / max(reset, 1.0))
+        # Never let a saved-up burst exceed what the server still allows
+        self._tokens = min(self._tokens, remaining)
+
+    def stats(self):
+        return {
+            'rate': round(self.rate, 3),
+            'tokens': round(self._tokens, 2),
+            'paused_for': round(max(0.0, self._paused_until - time.monotonic()), 2),
+            **self._stats,
+        }
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that paces requests through a RateLimiter.
+
+    429 and 5xx responses to idempotent requests are retried up to
+    `max_retries` times with full-jitter exponential backoff, never sooner
+    than the server's Retry-After.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    RETRY_METHODS = ('GET', 'HEAD')
+
+    def __init__(self, transport, limiter, max_retries=3, backoff_base=0.5, backoff_max=30.0):
+        self._transport = transport
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    async def handle_async_request(self, request):
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            with UPSTREAM_IN_FLIGHT.track():
+                response = await self._transport.handle_async_request(request)
+            UPSTREAM_RESPONSES.inc(host=request.url.host, status=response.status_code)
+            self.limiter.update_from_headers(response.headers)
+
+            if (
+                response.status_code not in self.RETRY_STATUSES
+                or request.method not in self.RETRY_METHODS
+                or attempt >= self.max_retries
+            ):
+                return response
+
+            retry_after = parse_retry_after(response.headers.get('retry-after'))
+            if retry_after is not None:
+                # Everyone else would get the same answer, hold the whole queue
+                self.limiter.pause(retry_after)
+            backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            delay = max(retry_after or 0.0, backoff)
+
+            await response.aclose()
+            attempt += 1
+            self.limiter._stats['retries'] += 1
+            print(f"HTTP {response.status_code} from {request.url.host}, retry {attempt} in {delay:.1f}s", file=sys.stderr)
+            await anyio.sleep(delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
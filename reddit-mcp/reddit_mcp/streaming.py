@@ -0,0 +1,91 @@
+from reddit_mcp.html_parser import CommentWalker, _lxml_available
+
+# Top-level things of both listings in a thread's .json: the post, then comments
+THREAD_THINGS_PREFIX = 'item.data.children.item'
+
+def ijson_available():
+    try:
+        import ijson  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def streaming_available(extraction_method):
+    if not ijson_available():
+        return False
+    if extraction_method in ['html', 'combined']:
+        return _lxml_available()
+    return True
+
+class AsyncByteReader:
+    """File-like `read()` over an httpx response body, for ijson's async API."""
+
+    def __init__(self, response):
+        self._chunks = response.aiter_bytes()
+        self._buffer = b''
+        self._exhausted = False
+
+    async def read(self, size=-1):
+        while not self._exhausted and (size < 0 or len(self._buffer) < size):
+            chunk = await anext(self._chunks, None)
+            if chunk is None:
+                self._exhausted = True
+                break
+            self._buffer += chunk
+            if size < 0:
+                continue
+
+        if size < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+async def iter_json_things(response):
+    """Yield the top-level things of a thread's .json as they finish parsing.
+
+    The first thing is the post itself, every following one is a complete
+    top-level comment (with its replies) or `more` stub. Only one top-level
+    subtree is held in memory at a time.
+    """
+    import ijson
+
+    async for thing in ijson.items_async(
+        AsyncByteReader(response), THREAD_THINGS_PREFIX, use_float=True
+    ):
+        yield thing
+
+async def iter_html_comments(response):
+    """Yield old-reddit comments while the HTML page is still downloading.
+
+    Body chunks are fed to an lxml pull parser and its events go through the
+    same CommentWalker as the batch lxml backend. Once a top-level comment
+    closes, its element and the already-processed siblings are dropped from
+    the partial tree so memory stays bounded by the largest comment subtree.
+    """
+    from lxml import etree
+
+    parser = etree.HTMLPullParser(events=('start', 'end'), tag=CommentWalker.TAGS)
+    walker = CommentWalker()
+
+    def drain():
+        for event, element in parser.read_events():
+            comment = walker.feed(event, element)
+            if comment is not None:
+                yield comment
+            if event == 'end' and element.tag == 'div' and walker.open_depth == 0:
+                element.clear()
+                parent = element.getparent()
+                while parent is not None and element.getprevious() is not None:
+                    del parent[0]
+
+    async for chunk in response.aiter_bytes():
+        parser.feed(chunk)
+        for comment in drain():
+            yield comment
+
+    parser.close()
+    for comment in drain():
+        yield comment
+    for comment in walker.close():
+        yield comment
@@ -0,0 +1,243 @@
+import json
+import re
+import sys
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qs, urlsplit
+
+import anyio
+from pydantic import AnyUrl
+
+from reddit_mcp.comments import REDDIT_BASE_URL
+
+WATCH_URI_PREFIX = "reddit://thread/"
+WATCH_URI_TEMPLATE = WATCH_URI_PREFIX + "{thread_id}"
+
+def watch_uri(thread_id):
+    return f"{WATCH_URI_PREFIX}{thread_id}"
+
+def thread_id_from_uri(uri):
+    uri = str(uri)
+    if not uri.startswith(WATCH_URI_PREFIX):
+        return None
+    thread_id = uri[len(WATCH_URI_PREFIX):].split('?', 1)[0].strip('/')
+    if not re.fullmatch(r'[a-zA-Z0-9]+', thread_id):
+        return None
+    return thread_id
+
+class WatchedThread:
+    __slots__ = (
+        'thread_id', 'link', 'subscribers', 'seen', 'updates', 'sequence',
+        'discussion', 'next_poll', 'polling', 'max_seen',
+    )
+
+    def __init__(self, thread_id, history, max_seen=5000):
+        self.thread_id = thread_id
+        self.link = f"{REDDIT_BASE_URL}/comments/{thread_id}/"
+        self.subscribers = set()
+        # comment id -> (score, text hash), None for ids only seen inside a `more` stub.
+        # Ordered by last sighting, the ids not polled for longest are dropped beyond max_seen.
+        self.seen = OrderedDict()
+        self.max_seen = max_seen
+        self.updates = deque(maxlen=history)
+        self.sequence = 0
+        self.discussion = None
+        self.next_poll = 0.0
+        self.polling = False
+
+    def remember(self, comment_id, fingerprint):
+        self.seen[comment_id] = fingerprint
+        self.seen.move_to_end(comment_id)
+        while len(self.seen) > self.max_seen:
+            self.seen.popitem(last=False)
+
+class ThreadWatcher:
+    """Polls subscribed threads and publishes only what changed between polls.
+
+    Threads are exposed as `reddit://thread/{thread_id}` resources. One
+    scheduler polls every subscribed thread each `interval` seconds with
+    `sort=new`, so new comments come first. Collapsed `more` stubs are only
+    expanded up to the first comment id already seen. Each poll that finds
+    new comments or changed scores/edits becomes an update, and subscribers
+    get a resources/updated notification to read it. The first poll of a
+    thread is published as a baseline update. Each thread remembers the
+    MAX_SEEN_COMMENTS comments it saw most recently, a comment dropped from
+    that and polled again is reported as new.
+    """
+
+    PAGE_SIZE = 100
+    MAX_EXPANSION_REQUESTS = 5
+    MAX_EXPANDED_COMMENTS = 500
+    MAX_SEEN_COMMENTS = 5000
+
+    def __init__(self, extractor, interval=30.0, concurrency=4, history=20):
+        self.extractor = extractor
+        self.interval = interval
+        self.concurrency = concurrency
+        self.history = history
+        self._threads = {}
+        self._wakeup = anyio.Event()
+
+    def _thread_for(self, uri):
+        thread_id = thread_id_from_uri(uri)
+        if thread_id is None:
+            raise ValueError(f"Unknown resource: {uri}")
+        return thread_id
+
+    def subscribe(self, uri, session):
+        thread_id = self._thread_for(uri)
+        if thread_id not in self._threads:
+            self._threads[thread_id] = WatchedThread(thread_id, self.history, self.MAX_SEEN_COMMENTS)
+            self._wakeup.set()
+        self._threads[thread_id].subscribers.add(session)
+
+    def unsubscribe(self, uri, session):
+        thread_id = self._thread_for(uri)
+        thread = self._threads.get(thread_id)
+        if thread is None:
+            return
+        thread.subscribers.discard(session)
+        if not thread.subscribers:
+            del self._threads[thread_id]
+
+    def watched_threads(self):
+        return list(self._threads.values())
+
+    def read(self, uri):
+        thread_id = self._thread_for(uri)
+        thread = self._threads.get(thread_id)
+        if thread is None:
+            raise ValueError(f"Thread {thread_id} is not watched, subscribe to {watch_uri(thread_id)} first")
+
+        since = parse_qs(urlsplit(str(uri)).query).get('since')
+        if since:
+            since = int(since[0])
+            updates = [update for update in thread.updates if update['sequence'] > since]
+            truncated = bool(thread.updates) and thread.updates[0]['sequence'] > since + 1
+        else:
+            updates = list(thread.updates)[-1:]
+            truncated = False
+
+        return json.dumps({
+            'thread': thread_id,
+            'discussion': thread.discussion,
+            'sequence': thread.sequence,
+            'truncated': truncated,
+            'updates': updates,
+        })
+
+    async def run(self):
+        limiter = anyio.CapacityLimiter(self.concurrency)
+
+        async with anyio.create_task_group() as task_group:
+            while True:
+                now = time.monotonic()
+                for thread in list(self._threads.values()):
+                    if thread.next_poll <= now and not thread.polling:
+                        thread.polling = True
+                        task_group.start_soon(self._poll_guarded, thread, limiter)
+
+                due_times = [thread.next_poll for thread in self._threads.values() if not thread.polling]
+                delay = min(due_times, default=now + self.interval) - now
+                with anyio.move_on_after(max(delay, 0.1)):
+                    await self._wakeup.wait()
+                self._wakeup = anyio.Event()
+
+    async def _poll_guarded(self, thread, limiter):
+        try:
+            async with limiter:
+                await self.poll(thread)
+        except Exception as e:
+            print(f"Watch error for {thread.thread_id}: {str(e)}", file=sys.stderr)
+        finally:
+            thread.polling = False
+            thread.next_poll = time.monotonic() + self.interval
+            self._wakeup.set()
+
+    async def poll(self, thread):
+        extractor = self.extractor
+        # A cached copy younger than the TTL would hide what changed since the last poll
+        discussion, response_data = await extractor._fetch_discussion_metadata(
+            thread.link,
+            params={'sort': 'new', 'limit': self.PAGE_SIZE},
+            headers={'Cache-Control': 'no-cache'},
+        )
+        more_stubs = []
+        comments = await extractor._offload(
+            extractor._extract_comments_from_api, response_data, more_stubs
+        )
+
+        baseline = thread.sequence == 0
+        unseen_ids = []
+        for stub in more_stubs:
+            for child_id in stub.get('children', []):
+                # Stub ids follow the sort order, everything past a known id is older
+                if child_id in thread.seen:
+                    thread.seen.move_to_end(child_id)
+                    break
+                if baseline:
+                    thread.remember(child_id, None)
+                elif child_id:
+                    unseen_ids.append(child_id)
+
+        if unseen_ids:
+            expanded, _ = await extractor._expand_more_stubs(
+                discussion['id'],
+                [{'children': unseen_ids}],
+                self.MAX_EXPANDED_COMMENTS,
+                self.MAX_EXPANSION_REQUESTS,
+            )
+            comments.extend(expanded)
+
+        new_comments, changed_comments = self._diff(thread, comments)
+        thread.discussion = discussion
+        if not baseline and not new_comments and not changed_comments:
+            return
+
+        thread.sequence += 1
+        thread.updates.append({
+            'sequence': thread.sequence,
+            'polled_at': time.time(),
+            'baseline': baseline,
+            'new': new_comments,
+            'changed': changed_comments,
+        })
+        await self._notify(thread)
+
+    def _diff(self, thread, comments):
+        new_comments = []
+        changed_comments = []
+
+        for comment in comments:
+            fingerprint = (comment.score, hash(comment.text))
+            known = comment.id in thread.seen
+            previous = thread.seen.get(comment.id)
+            thread.remember(comment.id, fingerprint)
+
+            if not known:
+                new_comments.append(comment.to_dict())
+            elif previous is not None and previous != fingerprint:
+                change = {
+                    'id': comment.id,
+                    'author': comment.author,
+                    'score': comment.score,
+                    'score_delta': (comment.score or 0) - (previous[0] or 0),
+                    'permalink': comment.permalink,
+                }
+                if previous[1] != fingerprint[1]:
+                    change['text'] = comment.text
+                changed_comments.append(change)
+
+        return new_comments, changed_comments
+
+    async def _notify(self, thread):
+        uri = AnyUrl(watch_uri(thread.thread_id))
+        for session in list(thread.subscribers):
+            try:
+                await session.send_resource_updated(uri)
+            except Exception:
+                # The client went away without unsubscribing
+                thread.subscribers.discard(session)
+
+        if not thread.subscribers:
+            self._threads.pop(thread.thread_id, None)
@@ -0,0 +1,171 @@
+import contextlib
+
+import httpx
+import mcp.types as types
+import pytest
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+
+from reddit_mcp.http_client import create_http_client
+
+THREAD_ID = "abc123"
+THREAD_URL = f"https://www.reddit.com/r/test/comments/{THREAD_ID}/title/"
+CREATED = 1_700_000_000
+
+
+def comment_thing(comment_id, parent, author, body, score=1, replies=()):
+    return {
+        'kind': 't1',
+        'data': {
+            'id': comment_id,
+            'parent_id': parent,
+            'author': author,
+            'body': body,
+            'score': score,
+            'created_utc': CREATED,
+            'permalink': f"/r/test/comments/{THREAD_ID}/title/{comment_id}/",
+            'replies': {'kind': 'Listing', 'data': {'children': list(replies)}} if replies else "",
+        },
+    }
+
+
+def more_thing(*children):
+    return {'kind': 'more', 'data': {'count': len(children), 'children': list(children)}}
+
+
+def post_data(post_id, title, created_utc=CREATED, stickied=False):
+    return {
+        'id': post_id,
+        'title': title,
+        'author': "op",
+        'created_utc': created_utc,
+        'score': 42,
+        'upvote_ratio': 0.9,
+        'url': f"https://www.reddit.com/r/test/comments/{post_id}/title/",
+        'selftext': "Post body",
+        'num_comments': 7,
+        'permalink': f"/r/test/comments/{post_id}/title/",
+        'stickied': stickied,
+    }
+
+
+def html_comment(author, body, comment_id=None, replies=""):
+    id_attr = f' id="thing_t1_{comment_id}"' if comment_id else ""
+    return (
+        f'<div class="thing comment"{id_attr}><div class="entry">'
+        f'<a class="author">{author}</a><span class="score">1 point</span>'
+        f'<div class="md"><p>{body}</p></div></div>'
+        f'<div class="child">{replies}</div></div>'
+    )
+
+
+class FakeReddit:
+    """Canned reddit responses for a MockTransport, recording every request.
+
+    The thread has two top-level comments and a reply in its JSON, a `more`
+    stub for two more top-level comments, and morechildren answers that
+    nest a reply and a second `more` stub to resolve in another round. The
+    old-reddit page has one comment the JSON lacks and one without a thing
+    id that is the JSON's c3.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.failing_threads = set()
+        self.listing = [post_data(f"p{index}", f"Post {index}", CREATED - index * 3600) for index in range(5)]
+        self.thread = [
+            {'kind': 'Listing', 'data': {'children': [{'kind': 't3', 'data': post_data(THREAD_ID, "Thread title")}]}},
+            {'kind': 'Listing', 'data': {'children': [
+                comment_thing("c1", f"t3_{THREAD_ID}", "alice", "First", 10, [
+                    comment_thing("c2", "t1_c1", "bob", "Reply to first", 5),
+                ]),
+                comment_thing("c3", f"t3_{THREAD_ID}", "carol", "Third", 3),
+                more_thing("c4", "c5"),
+            ]}},
+        ]
+        self.more_children = {
+            "c4": [comment_thing("c4", f"t3_{THREAD_ID}", "dave", "Fourth", 2)],
+            "c5": [
+                comment_thing("c5", f"t3_{THREAD_ID}", "erin", "Fifth", 1),
+                comment_thing("c6", "t1_c5", "frank", "Reply to fifth", 1),
+                more_thing("c7"),
+            ],
+            "c7": [comment_thing("c7", "t1_c5", "grace", "Late reply", 1)],
+        }
+        self.html = "<html><body><div class='sitetable nestedlisting'>" + "".join([
+            html_comment("alice", "First", "c1", html_comment("bob", "Reply to first", "c2")
+                         + html_comment("heidi", "Only on the page", "c8")),
+            html_comment("carol", "Third", replies=html_comment("ivan", "Reply to third")),
+        ]) + "</div></body></html>"
+
+    def __call__(self, request):
+        self.requests.append(request)
+        path = request.url.path
+        if path == "/api/morechildren.json":
+            ids = request.url.params["children"].split(",")
+            things = [thing for child_id in ids for thing in self.more_children.get(child_id, [])]
+            return httpx.Response(200, json={'json': {'data': {'things': things}}})
+        if "/comments/" in path:
+            # Thread links with and without the subreddit and title
+            thread_id = path.split("/comments/", 1)[1].split("/")[0].removesuffix(".json")
+            if thread_id in self.failing_threads:
+                return httpx.Response(404)
+            if path.endswith(".json"):
+                return httpx.Response(200, json=self.thread)
+            return httpx.Response(200, text=self.html, headers={'Content-Type': 'text/html'})
+        if path == "/r/test/new.json":
+            return self._listing_page(request)
+        return httpx.Response(404)
+
+    def _listing_page(self, request):
+        limit = int(request.url.params["limit"])
+        after = request.url.params.get("after")
+        start = 0
+        if after:
+            start = next(index for index, post in enumerate(self.listing) if f"t3_{post['id']}" == after) + 1
+        page = self.listing[start:start + limit]
+        next_after = f"t3_{page[-1]['id']}" if page and start + limit < len(self.listing) else None
+        return httpx.Response(200, json={'kind': 'Listing', 'data': {
+            'children': [{'kind': 't3', 'data': post} for post in page],
+            'after': next_after,
+        }})
+
+
+class FakeSession:
+    """Records what a tool call sends to its client before it returns."""
+
+    def __init__(self):
+        self.messages = []
+        self.progress = []
+
+    async def send_log_message(self, level, data, logger=None, related_request_id=None):
+        self.messages.append((logger, data))
+
+    async def send_progress_notification(self, progress_token, progress, total=None):
+        self.progress.append((progress, total))
+
+
+@contextlib.contextmanager
+def tool_call(session):
+    """Runs the block as a call that sent a progress token, with `session` behind `app.request_context`."""
+    token = request_ctx.set(RequestContext(1, types.RequestParams.Meta(progressToken="call"), session, None))
+    try:
+        yield session
+    finally:
+        request_ctx.reset(token)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def reddit():
+    return FakeReddit()
+
+
+@pytest.fixture
+async def client(reddit):
+    async with create_http_client(pool=httpx.MockTransport(reddit), max_retries=0) as http_client:
+        yield http_client
@@ -0,0 +1,92 @@
+import json
+import re
+
+import pytest
+from mcp.server.lowlevel import Server
+
+from conftest import THREAD_URL
+from mcp_common.executor import ToolExecutor
+from reddit_mcp.pagination import CursorLog
+from reddit_mcp.server import register_reddit_tools
+
+PAGE = {'output': "json", 'max_chars': 300}
+
+
+@pytest.fixture
+def cursor_log(tmp_path):
+    log = CursorLog(str(tmp_path / "continuations.sqlite3"))
+    yield log
+    log.close()
+
+
+def server_process(client, cursor_log=None, continuation_max_mb=128):
+    _, reddit_tool, _ = register_reddit_tools(
+        Server("test"), client, ToolExecutor(),
+        continuation_max_mb=continuation_max_mb, cursor_log=cursor_log,
+    )
+    return reddit_tool
+
+
+async def read_page(reddit_tool, arguments):
+    content, = await reddit_tool("reddit_extract", arguments)
+    page = json.loads(content.text)
+    return [comment['id'] for comment in page['comments']], page['page']['next_cursor']
+
+
+@pytest.mark.anyio
+async def test_cursors_are_bare_tokens(client):
+    _, cursor = await read_page(server_process(client), {'url': THREAD_URL, 'expand_more': True, **PAGE})
+
+    assert re.fullmatch(r"[A-Za-z0-9_-]{22}", cursor)
+
+
+@pytest.mark.anyio
+async def test_another_process_continues_a_cursor_it_never_stored(client, reddit, cursor_log):
+    first_process = server_process(client, cursor_log)
+    other_process = server_process(client, cursor_log)
+
+    first_page, cursor = await read_page(first_process, {'url': THREAD_URL, 'expand_more': True, **PAGE})
+    fetches = len(reddit.requests)
+    replayed_page, replayed_cursor = await read_page(other_process, {'cursor': cursor, **PAGE})
+    stored_page, stored_cursor = await read_page(first_process, {'cursor': cursor, **PAGE})
+
+    assert first_page == ["c1"]
+    assert replayed_page == stored_page == ["c2"]
+    # The other process extracted the thread again with the logged options
+    assert len(reddit.requests) == 2 * fetches
+    assert {request.url.path for request in reddit.requests[fetches:]} == {
+        "/r/test/comments/abc123/title.json", "/api/morechildren.json",
+    }
+    assert stored_cursor is not None and replayed_cursor is not None
+
+
+@pytest.mark.anyio
+async def test_a_replayed_cursor_pages_to_the_end_of_the_thread(client, cursor_log):
+    _, cursor = await read_page(server_process(client, cursor_log), {'url': THREAD_URL, 'expand_more': True, **PAGE})
+
+    pages = []
+    while cursor:
+        # A fresh process for every page, as behind a load balancer
+        ids, cursor = await read_page(server_process(client, cursor_log), {'cursor': cursor, **PAGE})
+        pages.append(ids)
+
+    assert pages == [["c2"], ["c3"], ["c4"], ["c5"], ["c6"], ["c7"]]
+
+
+@pytest.mark.anyio
+async def test_a_cursor_whose_thread_was_released_extracts_it_again(client, reddit):
+    # No room for any thread, every cursor only keeps its request
+    reddit_tool = server_process(client, continuation_max_mb=0)
+
+    first_page, cursor = await read_page(reddit_tool, {'url': THREAD_URL, 'expand_more': True, **PAGE})
+    fetches = len(reddit.requests)
+    second_page, _ = await read_page(reddit_tool, {'cursor': cursor, **PAGE})
+
+    assert (first_page, second_page) == (["c1"], ["c2"])
+    assert len(reddit.requests) == 2 * fetches
+
+
+@pytest.mark.anyio
+async def test_unknown_cursors_are_rejected(client, cursor_log):
+    with pytest.raises(ValueError, match="Unknown or expired cursor"):
+        await server_process(client, cursor_log)("reddit_extract", {'cursor': "token-only"})
@@ -0,0 +1,97 @@
+import pytest
+from mcp.server.lowlevel import Server
+
+from conftest import THREAD_URL, FakeSession, tool_call
+from mcp_common.executor import ToolExecutor
+from reddit_mcp.server import RedditExtractor, fetch_reddit_threads, register_reddit_tools
+
+
+def outline(comments):
+    return [(comment.id, comment.parent_id, comment.depth) for comment in comments]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_api_comments_come_out_in_pre_order(client, streaming):
+    result = await RedditExtractor(client).extract_reddit_content(THREAD_URL, streaming=streaming)
+
+    assert result['discussion']['title'] == "Thread title"
+    assert outline(result['comments']) == [("c1", "abc123", 0), ("c2", "c1", 1), ("c3", "abc123", 0)]
+
+
+@pytest.mark.anyio
+async def test_more_stubs_are_expanded_round_by_round(client, reddit):
+    result = await RedditExtractor(client).extract_reddit_content(THREAD_URL, expand_more=True)
+
+    assert outline(result['comments']) == [
+        ("c1", "abc123", 0), ("c2", "c1", 1), ("c3", "abc123", 0),
+        ("c4", "abc123", 0), ("c5", "abc123", 0), ("c6", "c5", 1), ("c7", "c5", 1),
+    ]
+    assert result['stats']['expanded_comments'] == 4
+    assert result['stats']['morechildren_requests'] == 2
+    first_round, second_round = [
+        request.url.params for request in reddit.requests if request.url.path == "/api/morechildren.json"
+    ]
+    assert first_round["children"] == "c4,c5"
+    assert first_round["link_id"] == "t3_abc123"
+    assert second_round["children"] == "c7"
+
+
+@pytest.mark.anyio
+async def test_expansion_stops_at_the_request_and_comment_budgets(client):
+    extractor = RedditExtractor(client)
+
+    by_requests = await extractor.extract_reddit_content(THREAD_URL, expand_more=True, max_requests=1)
+    by_comments = await extractor.extract_reddit_content(THREAD_URL, expand_more=True, max_comments=4)
+
+    assert [comment.id for comment in by_requests['comments']] == ["c1", "c2", "c3", "c4", "c5", "c6"]
+    assert by_requests['stats']['morechildren_requests'] == 1
+    assert [comment.id for comment in by_comments['comments']] == ["c1", "c2", "c3", "c4"]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_combined_merges_page_only_comments_into_the_api_tree(client, streaming):
+    result = await RedditExtractor(client).extract_reddit_content(
+        THREAD_URL, extraction_method='combined', streaming=streaming
+    )
+
+    comments = result['comments']
+    # c8 only exists on the page, the id-less page comment is c3 and its reply moves under c3
+    assert [(comment.id, comment.parent_id, comment.depth) for comment in comments[:4]] == [
+        ("c1", "abc123", 0), ("c2", "c1", 1), ("c8", "c1", 1), ("c3", "abc123", 0),
+    ]
+    assert (comments[4].author, comments[4].parent_id, comments[4].depth) == ("ivan", "c3", 1)
+    assert len(comments) == result['stats']['total_comments'] == 5
+
+
+@pytest.mark.anyio
+async def test_batch_results_keep_input_order_and_isolate_failures(client, reddit):
+    reddit.failing_threads.add("gone")
+    urls = [THREAD_URL, "https://www.reddit.com/r/test/comments/gone/title/", THREAD_URL]
+    completed = []
+
+    async def on_result(index, result):
+        completed.append(index)
+
+    results = await fetch_reddit_threads(urls, client=client, concurrency=2, on_result=on_result)
+
+    assert [result.get('error') for result in results] == [None, "Extraction error: API request failed: HTTP 404", None]
+    assert results[0]['discussion']['id'] == results[2]['discussion']['id'] == "abc123"
+    assert sorted(completed) == [0, 1, 2]
+
+
+@pytest.mark.anyio
+async def test_the_batch_tool_sends_each_result_as_it_completes(client, reddit):
+    reddit.failing_threads.add("gone")
+    _, reddit_tool, _ = register_reddit_tools(Server("test"), client, ToolExecutor())
+    urls = ["https://www.reddit.com/r/test/comments/gone/title/", THREAD_URL]
+
+    with tool_call(FakeSession()) as session:
+        contents = await reddit_tool("reddit_extract_batch", {'urls': urls, 'order': "completion"})
+
+    sent = [text for _, text in session.messages]
+    # The final response in completion order repeats what was sent, in the same order
+    assert sent == [content.text for content in contents]
+    assert f"URL: {urls[0]}\nError: Extraction error: API request failed: HTTP 404" in sent
+    assert [progress for progress, _ in session.progress] == [1, 2]
@@ -0,0 +1,144 @@
+import itertools
+import time
+
+import httpx
+import pytest
+
+from mcp_common.http_cache import ACCESS_RESOLUTION, HTTPCache, cache_key
+from reddit_mcp.http_client import create_http_client
+
+THREAD_URL = "https://www.reddit.com/r/test/comments/abc123/title.json"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    http_cache = HTTPCache(str(tmp_path / "http_cache.sqlite3"), ttl=60.0)
+    yield http_cache
+    http_cache.close()
+
+
+@pytest.mark.anyio
+async def test_rotating_response_cookies_do_not_defeat_the_cache(cache):
+    sent_cookies = []
+    tracker = itertools.count()
+
+    def upstream(request):
+        sent_cookies.append(request.headers.get("cookie"))
+        return httpx.Response(
+            200,
+            json={"ok": True},
+            headers={"Set-Cookie": f"session_tracker={next(tracker)}; Path=/; Domain=.reddit.com"},
+        )
+
+    async with create_http_client(cache=cache, pool=httpx.MockTransport(upstream)) as client:
+        first = await client.get(THREAD_URL)
+        second = await client.get(THREAD_URL)
+
+    assert first.json() == second.json() == {"ok": True}
+    assert second.headers["x-cache"] == "hit"
+    assert cache.stats == {"hits": 1, "revalidated": 0, "misses": 1}
+    assert sent_cookies == [None]
+
+
+@pytest.mark.anyio
+async def test_cookies_sent_by_the_caller_still_vary_the_cache(cache):
+    def upstream(request):
+        return httpx.Response(200, json={"cookie": request.headers.get("cookie")})
+
+    async with create_http_client(cache=cache, pool=httpx.MockTransport(upstream)) as client:
+        anonymous = await client.get(THREAD_URL)
+        signed_in = await client.get(THREAD_URL, headers={"Cookie": "reddit_session=secret"})
+
+    assert anonymous.json() == {"cookie": None}
+    assert signed_in.json() == {"cookie": "reddit_session=secret"}
+    assert cache.stats["misses"] == 2
+
+
+@pytest.mark.anyio
+async def test_no_cache_requests_are_revalidated_while_fresh(cache):
+    sent_validators = []
+
+    def upstream(request):
+        sent_validators.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"ok": True}, headers={"ETag": '"v1"'})
+
+    async with create_http_client(cache=cache, pool=httpx.MockTransport(upstream)) as client:
+        await client.get(THREAD_URL)
+        polled = await client.get(THREAD_URL, headers={"Cache-Control": "no-cache"})
+
+    assert polled.headers["x-cache"] == "revalidated"
+    assert polled.json() == {"ok": True}
+    assert sent_validators == [None, '"v1"']
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("validator, condition", [
+    ("ETag", "if-none-match"),
+    ("Last-Modified", "if-modified-since"),
+])
+async def test_stale_entries_are_revalidated_with_their_validators(tmp_path, validator, condition):
+    stale_cache = HTTPCache(str(tmp_path / "http_cache.sqlite3"), ttl=0.0)
+    value = '"v1"' if validator == "ETag" else "Wed, 21 Oct 2015 07:28:00 GMT"
+    conditions = []
+
+    def upstream(request):
+        conditions.append(request.headers.get(condition))
+        if request.headers.get(condition) == value:
+            return httpx.Response(304)
+        return httpx.Response(200, json={"ok": True}, headers={validator: value})
+
+    async with create_http_client(cache=stale_cache, pool=httpx.MockTransport(upstream)) as client:
+        await client.get(THREAD_URL)
+        revalidated = await client.get(THREAD_URL)
+    stale_cache.close()
+
+    assert conditions == [None, value]
+    assert revalidated.status_code == 200
+    assert revalidated.headers["x-cache"] == "revalidated"
+    assert revalidated.json() == {"ok": True}
+    assert stale_cache.stats == {"hits": 0, "revalidated": 1, "misses": 1}
+
+
+@pytest.mark.anyio
+async def test_changed_responses_replace_the_entry_and_errors_are_not_stored(tmp_path):
+    stale_cache = HTTPCache(str(tmp_path / "http_cache.sqlite3"), ttl=0.0)
+    responses = iter([
+        httpx.Response(200, json={"version": 1}, headers={"ETag": '"v1"'}),
+        httpx.Response(200, json={"version": 2}, headers={"ETag": '"v2"'}),
+        httpx.Response(503),
+    ])
+    conditions = []
+
+    def upstream(request):
+        conditions.append(request.headers.get("if-none-match"))
+        return next(responses)
+
+    async with create_http_client(
+        cache=stale_cache, pool=httpx.MockTransport(upstream), max_retries=0
+    ) as client:
+        assert (await client.get(THREAD_URL)).json() == {"version": 1}
+        assert (await client.get(THREAD_URL)).json() == {"version": 2}
+        assert (await client.get(THREAD_URL)).status_code == 503
+    entry = stale_cache.lookup(cache_key(THREAD_URL))
+    stale_cache.close()
+
+    assert conditions == [None, '"v1"', '"v2"']
+    assert entry.headers["etag"] == '"v2"'
+
+
+def test_hits_only_write_last_access_once_it_is_stale(cache, monkeypatch):
+    key = cache_key(THREAD_URL)
+    cache.store(key, 200, {}, b"{}")
+    statements = []
+    cache._db.set_trace_callback(statements.append)
+
+    for _ in range(3):
+        assert cache.lookup(key).body == b"{}"
+    assert not [statement for statement in statements if statement.startswith("UPDATE")]
+
+    clock = time.time()
+    monkeypatch.setattr(time, "time", lambda: clock + ACCESS_RESOLUTION)
+    cache.lookup(key)
+    assert [statement for statement in statements if statement.startswith("UPDATE")]
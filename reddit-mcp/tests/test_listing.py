@@ -0,0 +1,70 @@
+import time
+
+import pytest
+from mcp.server.lowlevel import Server
+
+from conftest import FakeSession, post_data, tool_call
+from mcp_common.executor import ToolExecutor
+from reddit_mcp.server import RedditExtractor, register_reddit_tools
+
+
+async def crawl(extractor, *args, **kwargs):
+    return [post['id'] async for post in extractor.iter_subreddit_posts("r/test", *args, **kwargs)]
+
+
+def listing_params(reddit):
+    return [dict(request.url.params) for request in reddit.requests]
+
+
+@pytest.mark.anyio
+async def test_small_limits_ask_for_one_short_page(client, reddit):
+    assert await crawl(RedditExtractor(client), 'new', 3) == ["p0", "p1", "p2"]
+    assert listing_params(reddit) == [{'limit': "3", 'raw_json': "1"}]
+
+
+@pytest.mark.anyio
+async def test_pages_follow_the_after_cursor(client, reddit, monkeypatch):
+    monkeypatch.setattr(RedditExtractor, "LISTING_PAGE_SIZE", 2)
+
+    assert await crawl(RedditExtractor(client), 'new', 100) == ["p0", "p1", "p2", "p3", "p4"]
+    assert [params.get('after') for params in listing_params(reddit)] == [None, "t3_p1", "t3_p3"]
+
+
+@pytest.mark.anyio
+async def test_max_age_stops_the_new_listing_at_the_first_older_post(client, reddit):
+    now = time.time()
+    reddit.listing = [post_data("pinned", "Pinned", now - 30 * 86400, stickied=True)] + [
+        post_data(f"p{index}", f"Post {index}", now - index * 3600 - 60) for index in range(5)
+    ]
+
+    assert await crawl(RedditExtractor(client), 'new', 100, max_age=2.5 * 3600) == ["p0", "p1", "p2"]
+    # Filtering by age asks for full pages, skipped posts do not count towards the limit
+    assert listing_params(reddit) == [{'limit': "100", 'raw_json': "1"}]
+
+
+def test_listing_arguments_are_validated():
+    extractor = RedditExtractor(None)
+
+    assert extractor._prepare_listing_endpoint("https://www.reddit.com/r/Python/", "top") == (
+        "https://www.reddit.com/r/Python/top.json"
+    )
+    with pytest.raises(ValueError):
+        extractor._prepare_listing_endpoint("r/../etc", "new")
+    with pytest.raises(ValueError):
+        extractor._prepare_listing_endpoint("r/test", "rising")
+
+
+@pytest.mark.anyio
+async def test_the_listing_tool_sends_each_page_as_it_arrives(client, monkeypatch):
+    monkeypatch.setattr(RedditExtractor, "LISTING_PAGE_SIZE", 2)
+    _, reddit_tool, _ = register_reddit_tools(Server("test"), client, ToolExecutor())
+
+    with tool_call(FakeSession()) as session:
+        content, = await reddit_tool("reddit_list_subreddit", {'subreddit': "test", 'limit': 5})
+
+    assert [logger for logger, _ in session.messages] == ["reddit_list_subreddit"] * 3
+    first_page = session.messages[0][1]
+    assert "Post 0" in first_page and "Post 1" in first_page and "Post 2" not in first_page
+    assert "Post 4" in session.messages[2][1]
+    assert session.progress == [(2, 5), (4, 5), (5, 5)]
+    assert content.text.startswith("5 posts from r/test (new)")
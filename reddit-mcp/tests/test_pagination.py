@@ -0,0 +1,68 @@
+from reddit_mcp.comments import Comment
+from reddit_mcp.pagination import COMMENT_OVERHEAD, ContinuationStore, estimate_size
+
+
+def make_thread(thread_id, comment_count, text_length=100):
+    comments = [
+        Comment(f"{thread_id}c{index}", thread_id, 0, "author", 0, "x" * text_length, 1)
+        for index in range(comment_count)
+    ]
+    return {
+        'discussion': {'id': thread_id, 'title': "title", 'content': ""},
+        'comments': comments,
+        'stats': {'total_comments': comment_count, 'extraction_method': 'api'},
+    }
+
+
+def test_estimate_size_counts_every_comment():
+    thread = make_thread("a", 1000, text_length=100)
+    assert estimate_size(thread) >= 1000 * (COMMENT_OVERHEAD + 100)
+
+
+def test_threads_beyond_the_byte_budget_are_evicted_least_recently_used_first():
+    threads = [make_thread(thread_id, 1000) for thread_id in "abc"]
+    thread_size = estimate_size(threads[0])
+    store = ContinuationStore(max_entries=100, max_bytes=int(thread_size * 2.5))
+
+    first = store.put(threads[0], 10)
+    second = store.put(threads[1], 10)
+    # Reading the first cursor makes the second one the least recently used
+    assert store.get(first) is not None
+    third = store.put(threads[2], 10)
+
+    # The second cursor let go of its thread but still knows where to continue
+    assert store.get(second) == (None, 10, None)
+    assert store.get(first)[0] is threads[0]
+    assert store.get(third)[0] is threads[2]
+    assert store.size <= store.max_bytes
+
+
+def test_pages_of_one_thread_count_its_size_once():
+    thread = make_thread("a", 1000)
+    thread_size = estimate_size(thread)
+    store = ContinuationStore(max_entries=100, max_bytes=int(thread_size * 1.5))
+
+    cursors = [store.put(thread, start) for start in range(0, 1000, 100)]
+
+    assert store.size == thread_size
+    assert all(store.get(cursor)[0] is thread for cursor in cursors)
+
+
+def test_a_thread_larger_than_the_budget_is_not_kept():
+    thread = make_thread("a", 1000)
+    store = ContinuationStore(max_bytes=estimate_size(thread) - 1)
+
+    cursor = store.put(thread, 10)
+
+    assert store.get(cursor) == (None, 10, None)
+    assert store.size == 0
+
+
+def test_evicting_the_last_cursor_of_a_thread_releases_its_size():
+    threads = [make_thread(thread_id, 100) for thread_id in "ab"]
+    store = ContinuationStore(max_entries=1)
+
+    store.put(threads[0], 10)
+    store.put(threads[1], 10)
+
+    assert store.size == estimate_size(threads[1])
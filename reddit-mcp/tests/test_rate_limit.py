@@ -0,0 +1,118 @@
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from reddit_mcp.rate_limit import RateLimitedTransport, RateLimiter, parse_retry_after
+
+THREAD_URL = "https://www.reddit.com/r/test/comments/abc123/title.json"
+
+
+def sequence_upstream(*responses):
+    seen = []
+
+    def upstream(request):
+        seen.append(request)
+        return responses[min(len(seen), len(responses)) - 1]
+
+    return upstream, seen
+
+
+def test_parse_retry_after_accepts_seconds_and_dates():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+def test_rate_follows_the_remaining_budget():
+    limiter = RateLimiter(rate=10.0, burst=10)
+
+    limiter.update_from_headers({"x-ratelimit-remaining": "100", "x-ratelimit-reset": "50"})
+
+    assert limiter.rate == 2.0
+    limiter.update_from_headers({"x-ratelimit-remaining": "5", "x-ratelimit-reset": "50"})
+    assert limiter.rate == pytest.approx(0.1)
+    assert limiter.stats()["tokens"] <= 5
+
+
+def test_each_process_gets_its_share_of_the_budget():
+    limiter = RateLimiter(rate=10.0, burst=10, share=0.25)
+
+    limiter.update_from_headers({"x-ratelimit-remaining": "100", "x-ratelimit-reset": "50"})
+
+    assert limiter.rate == 0.5
+    assert limiter.burst == 2.5
+
+
+def test_a_spent_budget_pauses_until_the_window_resets():
+    limiter = RateLimiter()
+
+    limiter.update_from_headers({"x-ratelimit-remaining": "0", "x-ratelimit-reset": "40"})
+
+    assert 39 < limiter.stats()["paused_for"] <= 40
+
+
+@pytest.mark.anyio
+async def test_requests_beyond_the_burst_wait_for_tokens():
+    limiter = RateLimiter(rate=20.0, burst=1)
+
+    started = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire()
+
+    assert time.monotonic() - started >= 0.09
+    assert limiter.stats()["delayed"] == 2
+
+
+@pytest.mark.anyio
+async def test_server_errors_are_retried_and_reported_on_stderr(capsys):
+    upstream, seen = sequence_upstream(httpx.Response(503), httpx.Response(502), httpx.Response(200))
+    limiter = RateLimiter()
+    transport = RateLimitedTransport(httpx.MockTransport(upstream), limiter, backoff_base=0.0)
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        response = await client.get(THREAD_URL)
+
+    assert response.status_code == 200
+    assert len(seen) == 3
+    assert limiter.stats()["retries"] == 2
+    output = capsys.readouterr()
+    assert output.out == ""
+    assert "retry 2" in output.err
+
+
+@pytest.mark.anyio
+async def test_retries_wait_for_retry_after_and_hold_the_queue():
+    upstream, seen = sequence_upstream(
+        httpx.Response(429, headers={"Retry-After": "0.2"}), httpx.Response(200)
+    )
+    limiter = RateLimiter()
+    transport = RateLimitedTransport(httpx.MockTransport(upstream), limiter, backoff_base=0.0)
+
+    started = time.monotonic()
+    async with httpx.AsyncClient(transport=transport) as client:
+        response = await client.get(THREAD_URL)
+
+    assert response.status_code == 200
+    assert time.monotonic() - started >= 0.2
+    assert len(seen) == 2
+
+
+@pytest.mark.anyio
+async def test_retries_stop_after_max_retries_and_skip_unsafe_methods():
+    upstream, seen = sequence_upstream(httpx.Response(500))
+    transport = RateLimitedTransport(
+        httpx.MockTransport(upstream), RateLimiter(), max_retries=2, backoff_base=0.0
+    )
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        assert (await client.get(THREAD_URL)).status_code == 500
+        assert len(seen) == 3
+        assert (await client.post(THREAD_URL)).status_code == 500
+        assert len(seen) == 4
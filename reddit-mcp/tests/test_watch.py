@@ -0,0 +1,36 @@
+import httpx
+import pytest
+
+from conftest import THREAD_ID
+from mcp_common.http_cache import HTTPCache
+from reddit_mcp.http_client import create_http_client
+from reddit_mcp.server import RedditExtractor
+from reddit_mcp.watch import ThreadWatcher, WatchedThread
+
+
+@pytest.mark.anyio
+async def test_polls_reach_upstream_while_the_cached_thread_is_fresh(tmp_path, reddit):
+    cache = HTTPCache(str(tmp_path / "http_cache.sqlite3"), ttl=60.0)
+    thread = WatchedThread(THREAD_ID, history=5)
+
+    async with create_http_client(cache=cache, pool=httpx.MockTransport(reddit)) as client:
+        watcher = ThreadWatcher(RedditExtractor(client))
+        await watcher.poll(thread)
+        reddit.thread[1]['data']['children'][1]['data']['score'] = 30
+        await watcher.poll(thread)
+    cache.close()
+
+    thread_fetches = [request for request in reddit.requests if request.url.path == f"/comments/{THREAD_ID}.json"]
+    assert len(thread_fetches) == 2
+    assert cache.stats['hits'] == 0
+    assert [(change['id'], change['score_delta']) for change in thread.updates[-1]['changed']] == [("c3", 27)]
+
+
+@pytest.mark.anyio
+async def test_seen_comments_are_capped_dropping_the_least_recent(client):
+    thread = WatchedThread(THREAD_ID, history=5, max_seen=3)
+
+    await ThreadWatcher(RedditExtractor(client)).poll(thread)
+
+    # The stub ids c4 and c5 were remembered first, the comments polled after them push them out
+    assert list(thread.seen) == ["c1", "c2", "c3"]